@@ -1,12 +1,33 @@
 """
 Backend package para Crypto Arbitrage Monitor
+
+Os submódulos são importados sob demanda (PEP 562): `import backend` não
+carrega requests, o engine nem o fetcher até que sejam usados.
 """
 
-from .crypto_data_fetcher import CryptoDataFetcher, RealTimeDataManager
-from .arbitrage_engine import ArbitrageEngine
+import importlib
+
+_LAZY_EXPORTS = {
+    'CryptoDataFetcher': 'backend.crypto_data_fetcher',
+    'RealTimeDataManager': 'backend.crypto_data_fetcher',
+    'ArbitrageEngine': 'backend.arbitrage_engine',
+}
 
 __all__ = [
     'CryptoDataFetcher',
     'RealTimeDataManager',
     'ArbitrageEngine'
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'backend' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
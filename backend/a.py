@@ -1,130 +1,306 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import math
 import random
 from typing import List, Tuple, Dict
 import time
 
+from backend.rate_snapshot import RateSnapshot
+from backend.market_state import MarketState
+from backend.log_space import (LogWeightStore, exceeds_threshold, profit_percent,
+                               cycle_log_profit)
+from backend.mean_cycle import min_mean_cycles
+
 class CryptoArbitrageMonitor:
     def __init__(self):
         self.currencies = []
         self.currency_idx = {}
         self.rates = {}
+        self.market = MarketState.empty()
+        self.log_weights = LogWeightStore(0)
+        # Lucro mínimo (%) para reportar uma oportunidade
+        self.min_profit_percent = 0.1
+        # Algoritmo de optimized_bellman_ford: 'bellman_ford' ou 'min_mean_cycle'
+        self.detection_method = 'bellman_ford'
         
-    def update_rates(self, rates: List[Tuple[str, str, float]]):
-        """Atualiza as taxas de câmbio e constrói a matriz de taxas"""
-        # Coletar todas as moedas únicas
-        currencies = set()
-        for from_curr, to_curr, rate in rates:
-            currencies.add(from_curr)
-            currencies.add(to_curr)
-
-        # Garantir que BRL seja sempre a primeira moeda
-        currencies_list = sorted(list(currencies))
-        if 'BRL' in currencies_list:
-            currencies_list.remove('BRL')
-            currencies_list.insert(0, 'BRL')
-
-        self.currencies = currencies_list
-        self.currency_idx = {curr: i for i, curr in enumerate(self.currencies)}
+    def update_rates(self, rates):
+        """Atualiza as taxas de câmbio e constrói a matriz de taxas
+
+        Aceita um RateSnapshot (moedas já ordenadas, BRL no índice 0) ou a
+        lista legada de tuplas (from, to, rate).
+        """
+        snapshot = RateSnapshot.from_tuples(rates)
+
+        self.currencies = snapshot.currencies
+        self.currency_idx = snapshot.currency_idx
         
         # Inicializar matriz de taxas com 0 (sem conversão)
         n = len(self.currencies)
         self.rates = [[0.0] * n for _ in range(n)]
+        self.log_weights = LogWeightStore(n)
         
-        # Preencher a matriz com as taxas conhecidas
-        for from_curr, to_curr, rate in rates:
-            i = self.currency_idx[from_curr]
-            j = self.currency_idx[to_curr]
-            self.rates[i][j] = rate
+        # Preencher a matriz com as taxas conhecidas (índices já resolvidos),
+        # contando os pares disponíveis e gravando -log(rate) no mesmo passo
+        matrix = self.rates
+        weights = self.log_weights
+        available_pairs = 0
+        for i, j, rate in zip(snapshot.from_idx, snapshot.to_idx, snapshot.rates):
+            if i != j and rate > 0 and matrix[i][j] <= 0:
+                available_pairs += 1
+            matrix[i][j] = rate
+            weights.set(i, j, rate)
             
         # Preencher diagonal (conversão para mesma moeda)
         for i in range(n):
             self.rates[i][i] = 1.0
-            
-    def find_arbitrage_opportunities(self) -> List[List[str]]:
-        """Encontra todas as oportunidades de arbitragem triangular começando em BRL"""
+
+        self.market = MarketState(snapshot, available_pairs)
+
+    def find_arbitrage_opportunities(self, base: int = 0) -> List[List[str]]:
+        """Encontra todas as oportunidades de arbitragem triangular começando na moeda base
+
+        Por padrão a base é BRL (índice 0).
+        """
         n = len(self.currencies)
         opportunities = []
 
-        # Sempre começar de BRL (índice 0)
-        i = 0
+        i = base
+        weights = self.log_weights.weights
 
-        # Verificar todos os pares possíveis partindo de BRL
+        # Verificar todos os pares possíveis partindo da base
         for j in range(n):
             for k in range(n):
                 if i == j or j == k or i == k:
                     continue
 
-                # Calcular o produto das taxas no triângulo: BRL -> j -> k -> BRL
-                rate1 = self.rates[i][j]  # BRL -> j
+                # Calcular o produto das taxas no triângulo: base -> j -> k -> base
+                rate1 = self.rates[i][j]  # base -> j
                 rate2 = self.rates[j][k]  # j -> k
-                rate3 = self.rates[k][i]  # k -> BRL
+                rate3 = self.rates[k][i]  # k -> base
 
                 if rate1 > 0 and rate2 > 0 and rate3 > 0:
-                    product = rate1 * rate2 * rate3
+                    # Soma compensada dos logs em vez do produto direto
+                    log_profit = cycle_log_profit((weights[i][j], weights[j][k], weights[k][i]))
 
-                    # Se o produto > 1, há oportunidade de arbitragem
-                    if product > 1.001:  # 0.1% de margem para custos
-                        profit_percent = (product - 1) * 100
+                    # Se o log-lucro supera o limiar (margem para custos), há oportunidade
+                    if exceeds_threshold(log_profit, self.min_profit_percent):
                         path = [
-                            self.currencies[i],  # BRL
+                            self.currencies[i],  # base
                             self.currencies[j],
                             self.currencies[k],
-                            self.currencies[i]   # BRL
+                            self.currencies[i]   # base
                         ]
                         opportunities.append({
                             'path': path,
-                            'profit_percent': profit_percent,
+                            'profit_percent': profit_percent(log_profit),
+                            'log_profit': log_profit,
                             'rates': [rate1, rate2, rate3],
-                            'product': product
+                            'product': math.exp(log_profit)
                         })
 
         return sorted(opportunities, key=lambda x: x['profit_percent'], reverse=True)
     
-    def bellman_ford_arbitrage(self) -> List[Dict]:
-        """Versão aprimorada usando Bellman-Ford para detectar ciclos negativos começando em BRL"""
+    def bellman_ford_arbitrage(self, base: int = 0) -> List[Dict]:
+        """Versão aprimorada usando Bellman-Ford para detectar ciclos negativos começando na base (BRL por padrão)"""
+        arbitrage_cycles = []
+        cycles, _ = self._negative_cycles([base])
+        for cycle in cycles:
+            # Reorganizar ciclo para começar na moeda base
+            if base in cycle:
+                cycle = self._normalize_cycle_to(cycle, base)
+                log_profit = self.log_weights.cycle_log_profit(cycle)
+                if exceeds_threshold(log_profit, self.min_profit_percent):
+                    arbitrage_cycles.append(self._cycle_opportunity(cycle, log_profit))
+
+        return arbitrage_cycles
+
+    def min_mean_cycle_arbitrage(self, base: int = 0) -> List[Dict]:
+        """Ciclos de maior lucro por perna (Howard), o melhor primeiro
+
+        Como nos demais detectores, só entram ciclos da política ótima que
+        passam pela base (rotacionados para começar nela) com lucro acima do
+        mínimo. Traz 'profit_per_leg_percent' e 'mean_log_profit' (log-lucro
+        médio por perna).
+        """
+        opportunities = []
+        for mean, cycle in min_mean_cycles(self.log_weights.weights):
+            if mean >= 0:
+                break
+            if base not in cycle:
+                continue
+            cycle = self._normalize_cycle_to(cycle, base)
+            log_profit = self.log_weights.cycle_log_profit(cycle)
+            if exceeds_threshold(log_profit, self.min_profit_percent):
+                opp = self._cycle_opportunity(cycle, log_profit)
+                opp['mean_log_profit'] = -mean
+                opp['profit_per_leg_percent'] = profit_percent(-mean)
+                opportunities.append(opp)
+        return opportunities
+
+    def find_multi_base_opportunities(self, bases: List[str],
+                                      include_triangles: bool = True) -> Dict[str, List[Dict]]:
+        """Detecta oportunidades para várias moedas base em uma única execução
+
+        Um só Bellman-Ford multi-origem (todas as bases com distância 0) sobre
+        os mesmos pesos -log(rate); cada ciclo encontrado é rotacionado para
+        cada base que ele contém. Retorna {base: oportunidades ordenadas}.
+        """
+        base_idx = [self.currency_idx[b] for b in bases if b in self.currency_idx]
+        groups = {self.currencies[b]: [] for b in base_idx}
+        seen = {name: set() for name in groups}
+
+        cycles, _ = self._negative_cycles(base_idx)
+        for cycle in cycles:
+            present = [b for b in base_idx if b in cycle]
+            if not present:
+                continue
+            # O log-lucro não depende da rotação: calculado uma vez por ciclo
+            log_profit = self.log_weights.cycle_log_profit(cycle)
+            if not exceeds_threshold(log_profit, self.min_profit_percent):
+                continue
+            for b in present:
+                normalized = self._normalize_cycle_to(cycle, b)
+                key = tuple(normalized)
+                name = self.currencies[b]
+                if key not in seen[name]:
+                    seen[name].add(key)
+                    groups[name].append(self._cycle_opportunity(normalized, log_profit))
+
+        if include_triangles:
+            for b in base_idx:
+                name = self.currencies[b]
+                for opp in self.find_arbitrage_opportunities(b):
+                    key = tuple(self.currency_idx[c] for c in opp['path'])
+                    if key not in seen[name]:
+                        seen[name].add(key)
+                        groups[name].append(opp)
+
+        for name, opps in groups.items():
+            for opp in opps:
+                opp['base'] = name
+            opps.sort(key=lambda x: x['profit_percent'], reverse=True)
+        return groups
+
+    def _negative_cycles(self, sources: List[int], edges: List[Tuple[int, int, float]] = None,
+                         deadline: float = None) -> Tuple[List[List[int]], bool]:
+        """Relaxamento Bellman-Ford a partir de várias origens
+
+        Retorna (ciclos negativos, completo). Com deadline (time.perf_counter),
+        o relaxamento é interrompido quando o prazo acaba e os ciclos já
+        presentes no grafo de predecessores são devolvidos com completo=False.
+        """
         n = len(self.currencies)
-        dist = [0.0] * n
+        dist = [float('inf')] * n
         predec = [-1] * n
 
-        # Inicializar distâncias começando de BRL (índice 0)
-        for i in range(n):
-            dist[i] = 0.0 if i == 0 else float('inf')
+        # Inicializar distâncias com 0 em cada origem
+        for i in sources:
+            dist[i] = 0.0
 
-        # Aplicar Bellman-Ford com transformação logarítmica
-        edges = []
-        for i in range(n):
-            for j in range(n):
-                if i != j and self.rates[i][j] > 0:
-                    # Transformação: maximizar produto = minimizar soma de -log(rate)
-                    weight = -math.log(self.rates[i][j])
-                    edges.append((i, j, weight))
+        # Pesos -log(rate) já mantidos pelo LogWeightStore a cada escrita
+        # (maximizar produto = minimizar soma de -log(rate))
+        if edges is None:
+            edges = self.log_weights.edges()
 
         # Relaxamento das arestas
+        complete = True
         for _ in range(n - 1):
+            if deadline is not None and time.perf_counter() >= deadline:
+                complete = False
+                break
+            changed = False
             for u, v, w in edges:
                 if dist[u] != float('inf') and dist[u] + w < dist[v]:
                     dist[v] = dist[u] + w
                     predec[v] = u
+                    changed = True
+            # Sem relaxamentos: distâncias convergiram, não há o que propagar
+            if not changed:
+                break
 
         # Detectar ciclos negativos (oportunidades de arbitragem)
-        arbitrage_cycles = []
+        cycles = []
         for u, v, w in edges:
             if dist[u] != float('inf') and dist[u] + w < dist[v]:
                 # Encontrou ciclo negativo - reconstruir o ciclo
                 cycle = self._reconstruct_cycle(v, predec)
                 if cycle and len(cycle) > 2:
-                    # Reorganizar ciclo para começar em BRL (índice 0)
-                    if 0 in cycle:
-                        cycle = self._normalize_cycle_to_brl(cycle)
-                        profit = self._calculate_cycle_profit(cycle)
-                        if profit > 1.001:
-                            arbitrage_cycles.append({
-                                'path': [self.currencies[i] for i in cycle],
-                                'profit_percent': (profit - 1) * 100,
-                                'product': profit
-                            })
+                    cycles.append(cycle)
 
-        return arbitrage_cycles
+        return cycles, complete
+
+    def deadline_detection(self, budget_seconds: float,
+                           edge_priority: Dict[Tuple[str, str], float] = None,
+                           bases: List[str] = None) -> Tuple[List[Dict], bool]:
+        """Detecção 'anytime': melhores ciclos encontrados dentro do prazo
+
+        As arestas são percorridas da mais promissora para a menos (edge_priority
+        por par (from, to)). Primeiro fecha triângulos a partir das bases sobre
+        essas arestas, depois roda Bellman-Ford multi-origem até o prazo acabar.
+        Retorna (oportunidades ordenadas, completo); cada uma traz 'base', e um
+        ciclo que passa por várias bases aparece uma vez por base.
+        """
+        deadline = time.perf_counter() + budget_seconds
+        if bases is None:
+            bases = self.currencies[:1]  # BRL
+        base_idx = [self.currency_idx[b] for b in bases if b in self.currency_idx]
+
+        edges = self.log_weights.edges()
+        if edge_priority:
+            currencies = self.currencies
+            edges = sorted(edges, key=lambda e: edge_priority.get((currencies[e[0]], currencies[e[1]]), 0.0),
+                           reverse=True)
+
+        found = {}
+        weights = self.log_weights.weights
+
+        def consider(cycle: List[int], log_profit: float):
+            # Uma rotação por base contida no ciclo (como find_multi_base_opportunities)
+            if not exceeds_threshold(log_profit, self.min_profit_percent):
+                return
+            for start in base_idx:
+                if start not in cycle:
+                    continue
+                normalized = self._normalize_cycle_to(cycle, start)
+                key = tuple(normalized)
+                if key not in found:
+                    opp = self._cycle_opportunity(normalized, log_profit)
+                    opp['base'] = self.currencies[start]
+                    found[key] = opp
+
+        # Fase 1: triângulos base -> u -> v -> base, arestas (u, v) em ordem de prioridade
+        complete = True
+        for count, (u, v, w) in enumerate(edges):
+            if count % 64 == 0 and time.perf_counter() >= deadline:
+                complete = False
+                break
+            for b in base_idx:
+                if b == u or b == v:
+                    continue
+                out_w = weights[b][u]
+                back_w = weights[v][b]
+                if out_w != float('inf') and back_w != float('inf'):
+                    consider([b, u, v], cycle_log_profit((out_w, w, back_w)))
+
+        # Fase 2: ciclos de qualquer tamanho com o tempo que restar
+        if complete:
+            cycles, complete = self._negative_cycles(base_idx, edges, deadline)
+            for cycle in cycles:
+                if any(b in cycle for b in base_idx):
+                    consider(cycle, self.log_weights.cycle_log_profit(cycle))
+
+        opportunities = sorted(found.values(), key=lambda x: x['profit_percent'], reverse=True)
+        return opportunities, complete
+
+    def _cycle_opportunity(self, cycle: List[int], log_profit: float) -> Dict:
+        return {
+            'path': [self.currencies[i] for i in cycle],
+            'profit_percent': profit_percent(log_profit),
+            'log_profit': log_profit,
+            'product': math.exp(log_profit)
+        }
     
     def _reconstruct_cycle(self, start: int, predec: List[int]) -> List[int]:
         """Reconstrói o ciclo a partir dos predecessores"""
@@ -152,52 +328,38 @@ class CryptoArbitrageMonitor:
         return cycle[::-1]  # Inverter para ordem correta
     
     def _calculate_cycle_profit(self, cycle: List[int]) -> float:
-        """Calcula o lucro de um ciclo de arbitragem"""
-        profit = 1.0
-        for i in range(len(cycle)):
-            from_idx = cycle[i]
-            to_idx = cycle[(i + 1) % len(cycle)]
-            profit *= self.rates[from_idx][to_idx]
-        return profit
+        """Calcula o lucro (produto das taxas) de um ciclo via soma compensada de logs"""
+        return math.exp(self.log_weights.cycle_log_profit(cycle))
 
     def _normalize_cycle_to_brl(self, cycle: List[int]) -> List[int]:
         """Reorganiza o ciclo para sempre começar e terminar em BRL (índice 0)"""
-        if 0 not in cycle:
+        return self._normalize_cycle_to(cycle, 0)
+
+    def _normalize_cycle_to(self, cycle: List[int], base: int) -> List[int]:
+        """Reorganiza o ciclo para começar e terminar na moeda base indicada"""
+        if base not in cycle:
             return cycle
 
-        # Encontrar a posição do BRL no ciclo
-        brl_pos = cycle.index(0)
+        # Encontrar a posição da base no ciclo
+        base_pos = cycle.index(base)
 
-        # Reorganizar o ciclo para começar em BRL
-        normalized = cycle[brl_pos:] + cycle[:brl_pos]
+        # Reorganizar o ciclo para começar na base
+        normalized = cycle[base_pos:] + cycle[:base_pos]
 
-        # Adicionar BRL no final para fechar o ciclo
-        normalized.append(0)
+        # Adicionar a base no final para fechar o ciclo
+        normalized.append(base)
 
         return normalized
 
     def get_arbitrage_statistics(self) -> Dict:
-        """Retorna estatísticas sobre o estado atual do mercado"""
-        n = len(self.currencies)
-        total_pairs = n * (n - 1)
-
-        # Contar pares disponíveis (com taxa > 0)
-        available_pairs = 0
-        for i in range(n):
-            for j in range(n):
-                if i != j and self.rates[i][j] > 0:
-                    available_pairs += 1
-
-        return {
-            'total_currencies': n,
-            'total_possible_pairs': total_pairs,
-            'available_pairs': available_pairs,
-            'coverage_percent': (available_pairs / total_pairs * 100) if total_pairs > 0 else 0
-        }
+        """Retorna estatísticas sobre o estado atual do mercado (calculadas em update_rates)"""
+        return self.market.statistics()
 
-    def optimized_bellman_ford(self) -> List[Dict]:
-        """Alias para bellman_ford_arbitrage - versão otimizada"""
-        return self.bellman_ford_arbitrage()
+    def optimized_bellman_ford(self, base: int = 0) -> List[Dict]:
+        """Detecção principal: Bellman-Ford ou ciclo de custo médio mínimo (detection_method)"""
+        if self.detection_method == 'min_mean_cycle':
+            return self.min_mean_cycle_arbitrage(base)
+        return self.bellman_ford_arbitrage(base)
 
 def simulate_market_data() -> List[Tuple[str, str, float]]:
     """Simula dados de mercado em tempo real com oportunidades de arbitragem"""
@@ -6,111 +6,440 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+import config
 from backend.a import CryptoArbitrageMonitor
 from backend.crypto_data_fetcher import RealTimeDataManager
+from backend.profiler import PROFILER
+from backend.opportunity_tracker import OpportunityTracker, cycle_key
+from backend.cross_rates import CrossRateEngine
+from backend.rate_snapshot import RateSnapshot
+from backend.log_space import exceeds_threshold, profit_percent
+from backend.history_store import HistoryStore
+from backend.spread_scanner import SpreadScanner
+from backend.robustness import RobustnessScorer, SCORE_FIELDS
+from backend.opportunity_index import OpportunityIndex
+from backend.checkpoint import save_checkpoint, load_checkpoint
+from backend.structured_logging import get_logger, setup_logging, queue_depth
 import json
+import logging
 import time
 from datetime import datetime
 from typing import List, Dict
 import threading
-from collections import deque
+
+logger = get_logger('engine')
 
 class ArbitrageEngine:
     """Engine principal que coordena coleta de dados e detecção de arbitragem"""
 
-    def __init__(self, output_dir: str = "data"):
+    def __init__(self, output_dir: str = "data", fetcher=None, data_manager=None):
+        """fetcher substitui as APIs reais; data_manager substitui a coleta inteira
+        (ex.: processo de detecção do supervisor, alimentado pelo processo de coleta)"""
+        setup_logging(verbose=config.VERBOSE_LOGGING,
+                      json_output=config.LOG_FORMAT == 'json',
+                      level=config.LOG_LEVEL)
+
         self.monitor = CryptoArbitrageMonitor()
-        self.data_manager = RealTimeDataManager(update_interval=1)
+        self.monitor.min_profit_percent = config.MIN_PROFIT_THRESHOLD
+        self.monitor.detection_method = config.DETECTION_METHOD
+        if config.DETECTION_METHOD != 'bellman_ford' and (config.DETECTION_BUDGET_SECONDS or
+                                                          len(config.BASE_CURRENCIES) > 1):
+            logger.warning("⚠️  DETECTION_METHOD=%s ignorado: detecção com prazo e modo carteira "
+                           "têm algoritmos próprios", config.DETECTION_METHOD)
+        self.data_manager = data_manager or RealTimeDataManager(update_interval=1,
+                                                                rate_limits=config.FETCH_RATE_LIMITS,
+                                                                fetcher=fetcher)
         self.output_dir = output_dir
         self.is_running = False
+        self.tick_count = 0
+
+        # Ciclo de vida das oportunidades entre verificações
+        self.tracker = OpportunityTracker()
+
+        # Conjunto completo da última verificação, indexado para a API de consultas
+        self.opportunity_index = OpportunityIndex()
+
+        # Consumidores extras do payload de resultados (ex.: snapshot compartilhado)
+        self.result_sinks = []
+
+        # Taxas cruzadas sintéticas via moedas hub, só para pares das bases (avaliação/exibição)
+        self.cross_rates = (CrossRateEngine(config.CROSS_RATE_HUBS, anchors=config.BASE_CURRENCIES)
+                            if config.CALCULATE_CROSS_RATES else None)
+
+        # Robustez de cada ciclo sob choques de taxa (ranqueamento por lucro esperado)
+        self.robustness = (RobustnessScorer(config.ROBUSTNESS_SCENARIOS, quantile=config.ROBUSTNESS_QUANTILE)
+                           if config.ROBUSTNESS_SCENARIOS else None)
+
+        # Spreads do mesmo par entre exchanges
+        self.spread_scanner = SpreadScanner(config.MIN_SPREAD_PERCENT) if config.SCAN_CROSS_EXCHANGE_SPREADS else None
 
         # Criar diretório de saída
         os.makedirs(output_dir, exist_ok=True)
 
-        # Carregar histórico existente ou criar novo
-        self.opportunities_history = self._load_history()
+        # Sinais de prontidão (substituem esperas fixas no launcher)
+        self.ready = threading.Event()
+        self.history_loaded = threading.Event()
+        self._history_lock = threading.Lock()
+
+        # Histórico em camadas (raw/minuto/hora) carregado em background;
+        # até lá novas verificações se acumulam aqui
+        self.history = HistoryStore()
+        threading.Thread(target=self._load_history_background, daemon=True).start()
+
+        # Reinício a quente: taxas, cotações por fonte e oportunidades ativas
+        # do último checkpoint (detecção imediata sobre dados um pouco antigos)
+        self.checkpoint_path = os.path.join(output_dir, "checkpoint.bin")
+        self._last_checkpoint = 0.0
+        self._last_rates = None
+        # Taxas do checkpoint: resultados sobre elas saem como 'stale' até a primeira coleta
+        self._restored_rates = None
+        self.analyzing_checkpoint = False
+        self.restored = self._restore_checkpoint()
+
+        # Frontend passa a ter um snapshot válido imediatamente
+        self._save_warming_up()
 
         # Registrar callback para quando dados forem atualizados
-        self.data_manager.add_callback(self._on_data_updated)
+        self.data_manager.add_callback(self._on_data_updated, name='engine',
+                                       policy=config.EVENT_OVERFLOW_POLICY,
+                                       maxsize=config.EVENT_QUEUE_SIZE)
 
-    def _load_history(self):
-        """Carrega histórico existente do arquivo ou cria novo"""
-        history_path = os.path.join(self.output_dir, "history.json")
+    def _load_history(self) -> HistoryStore:
+        """Carrega o histórico em camadas (history.bin) ou migra o history.json legado"""
+        bin_path = os.path.join(self.output_dir, "history.bin")
+        json_path = os.path.join(self.output_dir, "history.json")
 
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r') as f:
-                    history_data = json.load(f)
-                    # Criar deque a partir dos dados carregados, mantendo limite de 100
-                    history = deque(history_data, maxlen=100)
-                    print(f"📜 Histórico carregado: {len(history)} registros anteriores")
-                    return history
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar histórico: {e}")
-                return deque(maxlen=100)
-        else:
-            return deque(maxlen=100)
+        try:
+            if os.path.exists(bin_path):
+                history = HistoryStore.load(bin_path)
+                logger.info("📜 Histórico carregado: %d verificações na última hora", len(history))
+                return history
+
+            history = HistoryStore()
+            if os.path.exists(json_path):
+                with open(json_path, 'r') as f:
+                    for entry in json.load(f):
+                        timestamp = datetime.fromisoformat(entry['timestamp']).timestamp()
+                        history.append(entry['count'], entry['top_profit'], timestamp)
+                logger.info("📜 Histórico carregado: %d registros anteriores", len(history))
+            return history
+        except Exception as e:
+            logger.warning("⚠️ Erro ao carregar histórico: %s", e)
+            return HistoryStore()
+
+    def _load_history_background(self):
+        """Carrega o histórico fora do construtor e mescla com o que já foi registrado"""
+        loaded = self._load_history()
+        with self._history_lock:
+            loaded.extend(self.history)
+            self.history = loaded
+        self.history_loaded.set()
+
+    def _save_history_tiers(self):
+        """Grava as camadas do histórico (chamado quando um agregado é fechado)"""
+        with self._history_lock:
+            self.history.save(os.path.join(self.output_dir, "history.bin"))
+
+    def _restore_checkpoint(self) -> bool:
+        """Carrega o checkpoint se existir e não estiver velho demais"""
+        if not config.CHECKPOINT_INTERVAL_SECONDS or not os.path.exists(self.checkpoint_path):
+            return False
+
+        try:
+            with PROFILER.stage("checkpoint.restore") as restore:
+                checkpoint = load_checkpoint(self.checkpoint_path)
+                if checkpoint.age > config.CHECKPOINT_MAX_AGE_SECONDS:
+                    logger.info("🕰️  Checkpoint ignorado: %.0fs de idade", checkpoint.age)
+                    return False
+                self.data_manager.restore(checkpoint.rates, checkpoint.quotes)
+                self.tracker.restore(checkpoint.tracker)
+                self._restored_rates = checkpoint.rates
+        except Exception as e:
+            logger.warning("⚠️ Erro ao carregar checkpoint: %s", e)
+            return False
+
+        logger.info("♻️  Checkpoint restaurado em %.1fms: %d taxas, %d oportunidades ativas (%.0fs de idade)",
+                    restore.elapsed * 1000, len(checkpoint.rates), len(checkpoint.tracker), checkpoint.age)
+        return True
+
+    def save_checkpoint(self, rates: RateSnapshot = None):
+        """Grava taxas, cotações por fonte e oportunidades ativas em checkpoint.bin
+
+        rates: snapshot analisado (padrão: o último passado a process_arbitrage).
+        Dados vindos do próprio checkpoint não são regravados com data nova.
+        """
+        rates = rates if rates is not None else self._last_rates
+        if rates is None or not len(rates) or rates is self._restored_rates:
+            return
+        try:
+            with PROFILER.stage("checkpoint.save"):
+                save_checkpoint(self.checkpoint_path, rates,
+                                self.data_manager.get_venue_quotes(), self.tracker.state())
+            self._last_checkpoint = time.time()
+        except Exception as e:
+            logger.warning("⚠️ Erro ao salvar checkpoint: %s", e)
+
+    def _save_warming_up(self):
+        """Grava um snapshot vazio marcado como 'warming_up' para o servidor já responder"""
+        results = {
+            'status': 'warming_up',
+            'timestamp': datetime.now().isoformat(),
+            'detection_time_seconds': 0,
+            'market': {
+                'currencies': 0,
+                'pairs': 0,
+                'synthetic_pairs': 0,
+                'coverage_percent': 0,
+                'crypto': 0,
+                'fiat': 0,
+                'all_currencies': []
+            },
+            'refresh_rates': {},
+            'opportunities': [],
+            'changes': [],
+            'spreads': [],
+            'statistics': {'total_found': 0, 'max_profit': 0, 'avg_profit': 0}
+        }
+        output_path = os.path.join(self.output_dir, "arbitrage_results.json")
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    def add_result_sink(self, sink):
+        """Registra função chamada com o dicionário de resultados de cada verificação"""
+        self.result_sinks.append(sink)
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """Bloqueia até a primeira análise completa (True) ou timeout (False)"""
+        return self.ready.wait(timeout)
 
     def _on_data_updated(self, rates, summary):
         """Callback chamado quando dados são atualizados"""
         if self.is_running:
             self.process_arbitrage(rates, summary)
 
+    def status(self) -> str:
+        """'warming_up' até a primeira análise, 'stale' enquanto ela usa o checkpoint, 'ready' depois"""
+        if not self.ready.is_set():
+            return 'warming_up'
+        return 'stale' if self.analyzing_checkpoint else 'ready'
+
     def process_arbitrage(self, rates, summary):
         """Processa detecção de arbitragem com taxas atualizadas"""
-        print(f"\n{'='*60}")
-        print(f"🔍 ANÁLISE DE ARBITRAGEM - {datetime.now().strftime('%H:%M:%S')}")
-        print(f"{'='*60}")
-
-        # Atualizar monitor com novas taxas
-        self.monitor.update_rates(rates)
-
-        # Obter estatísticas
-        stats = self.monitor.get_arbitrage_statistics()
-        print(f"📊 Mercado: {stats['total_currencies']} moedas, "
-              f"{stats['available_pairs']} pares ({stats['coverage_percent']:.1f}% cobertura)")
+        self.analyzing_checkpoint = self._restored_rates is not None and rates is self._restored_rates
+        if not self.analyzing_checkpoint:
+            self._restored_rates = None
+        self._last_rates = rates
+
+        with PROFILER.stage("tick"):
+            opportunities = self._analyze(rates, summary)
+
+        PROFILER.increment("ticks")
+        PROFILER.increment("opportunities_found", len(opportunities))
+        PROFILER.set_gauge("opportunities.last_tick", len(opportunities))
+
+        if not self.ready.is_set():
+            self.ready.set()
+            logger.info("✅ Engine pronta: primeira análise concluída")
+
+        if (config.CHECKPOINT_INTERVAL_SECONDS and
+                time.time() - self._last_checkpoint >= config.CHECKPOINT_INTERVAL_SECONDS):
+            self.save_checkpoint(rates)
+
+        # Relatório periódico de performance
+        self.tick_count += 1
+        if config.STATS_FREQUENCY and self.tick_count % config.STATS_FREQUENCY == 0:
+            self._report_performance()
+
+    def _analyze(self, rates, summary) -> List[Dict]:
+        """Executa os estágios de um tick e retorna as oportunidades filtradas"""
+        logger.debug("🔍 ANÁLISE DE ARBITRAGEM")
+
+        rates = RateSnapshot.from_tuples(rates)
+
+        # Derivar pares ausentes das bases através dos hubs (só recalcula o que mudou).
+        # São composições de arestas reais: não criam ciclos, ficam fora da detecção
+        crossed = None
+        if self.cross_rates is not None:
+            with PROFILER.stage("cross_rates"):
+                crossed = self.cross_rates.apply(rates)
+            PROFILER.increment("cross_rates.recomputed", self.cross_rates.last_recomputed)
+            PROFILER.set_gauge("market.synthetic_pairs", len(crossed) - crossed.direct_count)
+
+        # Atualizar monitor com as taxas diretas
+        with PROFILER.stage("update_rates"):
+            self.monitor.update_rates(rates)
+
+        # Obter estatísticas (agregadas durante a construção da matriz)
+        with PROFILER.stage("statistics"):
+            stats = self.monitor.market.statistics()
+            if crossed is not None:
+                stats = dict(stats, synthetic_pairs=len(crossed) - crossed.direct_count)
+        PROFILER.set_gauge("market.currencies", stats['total_currencies'])
+        PROFILER.set_gauge("market.pairs", stats['available_pairs'])
+        logger.debug("📊 Mercado: %d moedas, %d pares (%.1f%% cobertura)",
+                     stats['total_currencies'], stats['available_pairs'], stats['coverage_percent'])
 
         # Buscar oportunidades usando método otimizado
-        start_time = time.time()
-        opportunities = self.monitor.optimized_bellman_ford()
-        detection_time = time.time() - start_time
+        by_base = None
+        complete = True
+        if config.DETECTION_BUDGET_SECONDS:
+            # Modo com prazo: melhores ciclos encontrados dentro do orçamento
+            with PROFILER.stage("detect.deadline") as detection:
+                opportunities, complete = self.monitor.deadline_detection(
+                    config.DETECTION_BUDGET_SECONDS,
+                    self.data_manager.get_edge_priority(),
+                    config.BASE_CURRENCIES
+                )
+            detection_time = detection.elapsed
+            if not complete:
+                PROFILER.increment("detect.incomplete")
+            logger.debug("⚡ Detecção com prazo: %.4fs (%s)", detection_time,
+                         "completa" if complete else "interrompida")
+
+            if len(config.BASE_CURRENCIES) > 1:
+                by_base = {base: [] for base in config.BASE_CURRENCIES}
+                for opp in opportunities:
+                    by_base[opp['base']].append(opp)
+                # Lista geral: cada ciclo uma vez (uma das rotações)
+                opportunities = self._merge_opportunities(opportunities, [])
+        elif len(config.BASE_CURRENCIES) > 1:
+            # Modo carteira: uma única detecção compartilhada por todas as bases
+            with PROFILER.stage("detect.multi_base") as detection:
+                by_base = self.monitor.find_multi_base_opportunities(
+                    config.BASE_CURRENCIES,
+                    include_triangles=stats['total_currencies'] < config.MAX_CURRENCIES_FOR_TRIANGLE_SEARCH
+                )
+            detection_time = detection.elapsed
+            logger.debug("⚡ Detecção (%d bases): %.4fs", len(by_base), detection_time)
+
+            # Lista geral: cada ciclo uma vez, na rotação da primeira base que o contém
+            opportunities = self._merge_opportunities(
+                [opp for opps in by_base.values() for opp in opps], []
+            )
+        else:
+            # Base única (não necessariamente BRL); ausente do mercado = nada a detectar
+            base = self.monitor.currency_idx.get(config.BASE_CURRENCIES[0])
+            with PROFILER.stage(f"detect.{config.DETECTION_METHOD}") as detection:
+                opportunities = self.monitor.optimized_bellman_ford(base) if base is not None else []
+            detection_time = detection.elapsed
 
-        print(f"⚡ Detecção: {detection_time:.4f}s")
+            logger.debug("⚡ Detecção: %.4fs", detection_time)
 
-        # Também buscar triangulares para comparação se o grafo for pequeno
-        if stats['total_currencies'] < 15:
-            triangle_opps = self.monitor.find_arbitrage_opportunities()
-            print(f"🔺 Triangulares: {len(triangle_opps)} encontradas")
+            # Também buscar triangulares para comparação se o grafo for pequeno
+            if base is not None and stats['total_currencies'] < config.MAX_CURRENCIES_FOR_TRIANGLE_SEARCH:
+                with PROFILER.stage("detect.triangle"):
+                    triangle_opps = self.monitor.find_arbitrage_opportunities(base)
+                logger.debug("🔺 Triangulares: %d encontradas", len(triangle_opps))
 
-            # Combinar oportunidades (remover duplicatas)
-            all_opps = self._merge_opportunities(opportunities, triangle_opps)
-            opportunities = all_opps
+                # Combinar oportunidades (remover duplicatas)
+                all_opps = self._merge_opportunities(opportunities, triangle_opps)
+                opportunities = all_opps
 
         # Filtrar e ordenar
-        opportunities = [opp for opp in opportunities if opp['profit_percent'] > 0.1]
+        opportunities = [
+            opp for opp in opportunities
+            if exceeds_threshold(opp['log_profit'], config.MIN_PROFIT_THRESHOLD)
+        ]
         opportunities = sorted(opportunities, key=lambda x: x['profit_percent'], reverse=True)
 
+        # Reavaliar sob choques de volatilidade recente: descartar ciclos frágeis
+        # e ranquear pelo lucro no quantil baixo em vez do lucro no preço médio
+        if self.robustness is not None and opportunities:
+            with PROFILER.stage("robustness"):
+                self.robustness.score(opportunities, self.data_manager.get_volatility(),
+                                      config.MIN_PROFIT_THRESHOLD)
+            robust = [
+                opp for opp in opportunities
+                if opp['survival_probability'] >= config.MIN_SURVIVAL_PROBABILITY
+            ]
+            PROFILER.increment("opportunities.fragile", len(opportunities) - len(robust))
+            opportunities = sorted(robust, key=lambda x: x['risk_adjusted_profit_percent'], reverse=True)
+            if by_base is not None:
+                # Um veredito por ciclo, aplicado à rotação de cada base que o contém
+                verdicts = {cycle_key(opp['path']): opp for opp in opportunities}
+                for base, opps in by_base.items():
+                    kept = []
+                    for opp in opps:
+                        scored = verdicts.get(cycle_key(opp['path']))
+                        if scored is None:
+                            continue
+                        if scored is not opp:
+                            opp.update({field: scored[field] for field in SCORE_FIELDS})
+                        kept.append(opp)
+                    by_base[base] = sorted(kept, key=lambda x: x['risk_adjusted_profit_percent'],
+                                           reverse=True)
+
+        # Spreads entre exchanges (cotações por fonte, antes da mescla)
+        spreads = []
+        if self.spread_scanner is not None:
+            with PROFILER.stage("detect.spreads"):
+                spreads = self.spread_scanner.scan(self.data_manager.get_venue_quotes())
+            PROFILER.set_gauge("spreads.last_tick", len(spreads))
+            if spreads:
+                logger.debug("↔️  %d spreads entre exchanges (máx. %.4f%% em %s)",
+                             len(spreads), spreads[0]['spread_percent'], spreads[0]['pair'])
+
+        # Atualizar ciclo de vida (somente mudanças seguem adiante)
+        changes = self.tracker.update(opportunities)
+        self.tracker.annotate(opportunities)
+        PROFILER.set_gauge("opportunities.active", len(self.tracker.active))
+        if changes and logger.isEnabledFor(logging.INFO):
+            for event in changes:
+                if event['type'] != 'update':
+                    logger.info("🔁 %s: %s (%.4f%%, %.1fs ativa)", event['type'], event['key'],
+                                event['profit_percent'], event['duration_seconds'], extra={'event': event})
+
+        # Índice completo para consultas filtradas (troca atômica da referência)
+        with PROFILER.stage("index"):
+            self.opportunity_index = OpportunityIndex(
+                [self._opportunity_payload(opp) for opp in opportunities]
+            )
+
         # Exibir resultados
         if opportunities:
-            print(f"\n💰 {len(opportunities)} OPORTUNIDADES ENCONTRADAS:")
-            for i, opp in enumerate(opportunities[:5]):  # Top 5
-                path_str = " → ".join(opp['path'])
-                print(f"\n   #{i+1} Lucro: {opp['profit_percent']:.4f}%")
-                print(f"       Rota: {path_str}")
-                print(f"       Produto: {opp['product']:.8f}")
+            logger.info("💰 %d oportunidades encontradas (máx. %.4f%%)",
+                        len(opportunities), opportunities[0]['profit_percent'],
+                        extra={'opportunities': len(opportunities),
+                               'detection_seconds': detection_time})
+            # Detalhe por oportunidade só é montado se DEBUG estiver habilitado
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, opp in enumerate(opportunities[:5]):  # Top 5
+                    logger.debug("   #%d Lucro: %.4f%% | Rota: %s | Produto: %.8f",
+                                 i + 1, opp['profit_percent'], " → ".join(opp['path']), opp['product'],
+                                 extra={'path': opp['path'], 'profit_percent': opp['profit_percent']})
         else:
-            print("\n📭 Nenhuma oportunidade de arbitragem encontrada")
-            print("   (Mercado eficiente no momento)")
+            logger.info("📭 Nenhuma oportunidade de arbitragem encontrada (mercado eficiente no momento)",
+                        extra={'opportunities': 0, 'detection_seconds': detection_time})
 
         # Salvar resultados
-        self._save_results(opportunities, stats, summary, detection_time)
-
-        # Adicionar ao histórico
-        self.opportunities_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'count': len(opportunities),
-            'top_profit': opportunities[0]['profit_percent'] if opportunities else 0
-        })
+        with PROFILER.stage("save_results"):
+            self._save_results(opportunities, stats, summary, detection_time, changes,
+                               by_base, complete, spreads,
+                               self.cross_rates.synthetic_rates(crossed) if crossed is not None else None)
+
+        # Adicionar ao histórico (registro de tamanho fixo; agregados fechados vão para disco)
+        with self._history_lock:
+            closed = self.history.append(
+                len(opportunities),
+                opportunities[0]['profit_percent'] if opportunities else 0
+            )
+        if closed and self.history_loaded.is_set():
+            self._save_history_tiers()
+
+        return opportunities
+
+    def _report_performance(self):
+        """Imprime percentis por estágio e salva metrics.json"""
+        PROFILER.set_gauge("queue.log_records", queue_depth())
+        snapshot = PROFILER.snapshot()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("⏱️  PERFORMANCE (%d verificações)\n%s",
+                        self.tick_count, PROFILER.format_report(snapshot),
+                        extra={'ticks': self.tick_count})
+
+        metrics_path = os.path.join(self.output_dir, "metrics.json")
+        with open(metrics_path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
 
     def _merge_opportunities(self, opps1: List[Dict], opps2: List[Dict]) -> List[Dict]:
         """Mescla e remove oportunidades duplicadas"""
@@ -118,34 +447,63 @@ class ArbitrageEngine:
         merged = []
 
         for opp in opps1 + opps2:
-            # Criar assinatura do caminho
-            path_sig = tuple(sorted(opp['path']))
+            # Assinatura canônica: mesma rotação, ordem preservada
+            path_sig = cycle_key(opp['path'])
             if path_sig not in seen_paths:
                 seen_paths.add(path_sig)
                 merged.append(opp)
 
         return merged
 
-    def _save_results(self, opportunities, stats, summary, detection_time):
+    def _opportunity_payload(self, opp: Dict) -> Dict:
+        """Formato de uma oportunidade no JSON do frontend"""
+        return {
+            'path': opp['path'],
+            'base': opp.get('base', opp['path'][0]),
+            'profit_percent': round(opp['profit_percent'], 4),
+            'product': round(opp['product'], 8),
+            'path_length': len(opp['path']) - 1,
+            'first_seen': opp.get('first_seen'),
+            'duration_seconds': round(opp.get('duration_seconds', 0.0), 3),
+            'survival_probability': round(opp.get('survival_probability', 1.0), 4),
+            'expected_profit_percent': round(opp.get('expected_profit_percent', opp['profit_percent']), 4),
+            'risk_adjusted_profit_percent': round(opp.get('risk_adjusted_profit_percent', opp['profit_percent']), 4),
+            'profit_per_leg_percent': round(opp.get(
+                'profit_per_leg_percent', profit_percent(opp['log_profit'] / (len(opp['path']) - 1))
+            ), 4)
+        }
+
+    def _save_results(self, opportunities, stats, summary, detection_time, changes=None,
+                      by_base=None, complete=True, spreads=None, cross_rates=None):
         """Salva resultados em arquivo JSON para o frontend"""
+        market_summary = self.monitor.market.summary()
         results = {
+            'status': 'stale' if self.analyzing_checkpoint else 'ready',
             'timestamp': datetime.now().isoformat(),
             'detection_time_seconds': detection_time,
+            'detection_complete': complete,
             'market': {
                 'currencies': stats['total_currencies'],
                 'pairs': stats['available_pairs'],
+                'synthetic_pairs': stats['synthetic_pairs'],
                 'coverage_percent': stats['coverage_percent'],
-                'all_currencies': summary.get('currencies', [])
+                'crypto': market_summary['total_crypto'],
+                'fiat': market_summary['total_fiat'],
+                'all_currencies': market_summary['currencies']
+            },
+            'refresh_rates': {
+                pair: round(rate, 4)
+                for pair, rate in self.data_manager.get_refresh_rates().items()
             },
             'opportunities': [
-                {
-                    'path': opp['path'],
-                    'profit_percent': round(opp['profit_percent'], 4),
-                    'product': round(opp['product'], 8),
-                    'path_length': len(opp['path']) - 1
-                }
+                self._opportunity_payload(opp)
                 for opp in opportunities[:20]  # Top 20
             ],
+            'changes': changes or [],
+            'spreads': [
+                dict(spread, spread_percent=round(spread['spread_percent'], 4))
+                for spread in (spreads or [])[:config.MAX_OPPORTUNITIES_TO_SAVE]
+            ],
             'statistics': {
                 'total_found': len(opportunities),
                 'max_profit': opportunities[0]['profit_percent'] if opportunities else 0,
@@ -153,15 +511,35 @@ class ArbitrageEngine:
             }
         }
 
+        # Taxas cruzadas das bases (avaliação/exibição; não entram na detecção)
+        if cross_rates:
+            results['cross_rates'] = cross_rates
+
+        # Modo carteira: oportunidades agrupadas por moeda base
+        if by_base is not None:
+            results['by_base'] = {
+                base: [self._opportunity_payload(opp) for opp in opps[:config.MAX_OPPORTUNITIES_TO_SAVE]]
+                for base, opps in by_base.items()
+            }
+
         # Salvar arquivo principal
         output_path = os.path.join(self.output_dir, "arbitrage_results.json")
         with open(output_path, 'w') as f:
             json.dump(results, f, indent=2)
 
-        # Salvar histórico
-        history_path = os.path.join(self.output_dir, "history.json")
-        with open(history_path, 'w') as f:
-            json.dump(list(self.opportunities_history), f, indent=2)  # deque -> list para JSON
+        for sink in self.result_sinks:
+            try:
+                sink(results)
+            except Exception as e:
+                logger.warning("⚠️  Erro ao publicar resultados: %s", e)
+
+        # Salvar histórico (só após o carregamento, para não sobrescrever o arquivo anterior)
+        if self.history_loaded.is_set():
+            history_path = os.path.join(self.output_dir, "history.json")
+            with self._history_lock:
+                history = self.history.recent(config.HISTORY_SIZE)
+            with open(history_path, 'w') as f:
+                json.dump(history, f, indent=2)
 
     def start_monitoring(self):
         """Inicia monitoramento contínuo"""
@@ -175,10 +553,12 @@ class ArbitrageEngine:
 
         self.is_running = True
 
-        # Fazer primeira atualização imediatamente
-        self.data_manager.update_data()
-        rates, summary = self.data_manager.get_current_data()
-        self.process_arbitrage(rates, summary)
+        if self.restored:
+            # Primeira análise sobre o checkpoint; a coleta começa em background
+            self.data_manager.republish()
+        else:
+            # Fazer primeira atualização imediatamente (análise entregue pelo barramento)
+            self.data_manager.update_data()
 
         # Iniciar atualizações automáticas
         self.data_manager.start()
@@ -196,18 +576,20 @@ class ArbitrageEngine:
         """Para monitoramento"""
         self.is_running = False
         self.data_manager.stop()
+        if config.CHECKPOINT_INTERVAL_SECONDS:
+            self.save_checkpoint()
         print("✅ Engine parada")
 
         # Estatísticas finais
-        if self.opportunities_history:
-            total_checks = len(self.opportunities_history)
-            total_opps = sum(h['count'] for h in self.opportunities_history)
-            max_profit = max(h['top_profit'] for h in self.opportunities_history)
-
+        with self._history_lock:
+            if self.history_loaded.is_set():
+                self.history.save(os.path.join(self.output_dir, "history.bin"))
+            totals = self.history.totals()
+        if totals['checks']:
             print(f"\n📊 ESTATÍSTICAS FINAIS:")
-            print(f"   Verificações: {total_checks}")
-            print(f"   Oportunidades totais: {total_opps}")
-            print(f"   Maior lucro: {max_profit:.4f}%")
+            print(f"   Verificações: {totals['checks']}")
+            print(f"   Oportunidades totais: {totals['opportunities']}")
+            print(f"   Maior lucro: {totals['max_profit']:.4f}%")
 
 
 def main():
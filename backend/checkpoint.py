@@ -0,0 +1,105 @@
+"""
+Checkpoint do estado ao vivo para reinício a quente
+
+Grava num único arquivo binário compacto:
+- o último RateSnapshot coletado (moedas = índice de moedas, arrays de taxas);
+- as últimas cotações de cada fonte com seus timestamps;
+- as oportunidades ativas do OpportunityTracker.
+
+Layout: cabeçalho | snapshot (RateSnapshot.to_bytes) | metadados JSON (nomes
+de fontes e pares, tracker) | registros QUOTE de tamanho fixo. Na leitura o
+arquivo é mapeado em memória e as cotações são decodificadas direto do mmap,
+então a restauração leva milissegundos e a engine já pode detectar sobre os
+dados (um pouco antigos) enquanto a primeira coleta roda em background.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from backend.rate_snapshot import RateSnapshot
+
+FILE_MAGIC = b'ACK1'
+
+# Cabeçalho: magic, gravado em (epoch), tamanhos do snapshot e dos metadados, nº de cotações
+HEADER = struct.Struct('<4sdIII')
+
+# Cotação: índice da fonte, índice do par, preço, timestamp
+QUOTE = struct.Struct('<HIdd')
+
+# Campos da oportunidade preservados no estado do tracker
+OPPORTUNITY_FIELDS = ('path', 'base', 'profit_percent', 'log_profit', 'product')
+
+VenueQuotes = Dict[str, Dict[str, Tuple[float, float]]]
+
+
+class Checkpoint:
+    """Estado restaurado de um arquivo de checkpoint"""
+
+    def __init__(self, saved_at: float, rates: RateSnapshot, quotes: VenueQuotes, tracker: List[Dict]):
+        self.saved_at = saved_at
+        self.rates = rates
+        self.quotes = quotes
+        self.tracker = tracker
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.saved_at
+
+
+def save_checkpoint(path: str, rates: RateSnapshot, quotes: VenueQuotes, tracker: List[Dict]):
+    """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+    sources = sorted(quotes)
+    pair_idx: Dict[str, int] = {}
+    records = []
+    for s, source in enumerate(sources):
+        for pair, (price, timestamp) in quotes[source].items():
+            records.append(QUOTE.pack(s, pair_idx.setdefault(pair, len(pair_idx)), price, timestamp))
+
+    snapshot = rates.to_bytes()
+    meta = json.dumps({
+        'sources': sources,
+        'pairs': list(pair_idx),
+        'tracker': [
+            dict(entry, opportunity={k: entry['opportunity'][k]
+                                     for k in OPPORTUNITY_FIELDS if k in entry['opportunity']})
+            for entry in tracker
+        ],
+    }).encode('utf-8')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(FILE_MAGIC, time.time(), len(snapshot), len(meta), len(records)))
+        f.write(snapshot)
+        f.write(meta)
+        f.write(b''.join(records))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Lê um arquivo gravado por save_checkpoint (ValueError se inválido)"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, saved_at, snapshot_len, meta_len, quote_count = HEADER.unpack_from(mm, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"Arquivo de checkpoint inválido: {path}")
+
+        offset = HEADER.size
+        rates = RateSnapshot.from_bytes(mm[offset:offset + snapshot_len])
+        offset += snapshot_len
+        meta = json.loads(mm[offset:offset + meta_len])
+        offset += meta_len
+
+        sources = meta['sources']
+        pairs = meta['pairs']
+        quotes: VenueQuotes = {source: {} for source in sources}
+        view = memoryview(mm)[offset:offset + quote_count * QUOTE.size]
+        try:
+            for s, p, price, timestamp in QUOTE.iter_unpack(view):
+                quotes[sources[s]][pairs[p]] = (price, timestamp)
+        finally:
+            view.release()
+
+    return Checkpoint(saved_at, rates, quotes, meta['tracker'])
@@ -0,0 +1,136 @@
+"""
+Síntese de taxas cruzadas através de moedas hub (USD/USDT/BTC)
+
+Para cada par sem cotação direta A→B que envolve uma moeda âncora (as bases da
+carteira), deriva A→hub→B usando o primeiro hub disponível na ordem de
+liquidez. Taxas cruzadas são composições de arestas reais: não criam ciclos
+novos, então servem para avaliação e exibição, não para a detecção. As derivações ficam em cache junto com um
+índice de dependência (aresta de entrada → pares derivados), então quando só
+as taxas mudam apenas os cruzamentos afetados são recalculados. Mudanças de
+estrutura (moedas ou pares novos/removidos) disparam uma reconstrução.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from backend.rate_snapshot import RateSnapshot
+
+# Hubs em ordem de preferência (mais líquido primeiro)
+DEFAULT_HUBS = ('USD', 'USDT', 'BTC')
+
+
+class CrossRateEngine:
+    """Deriva arestas sintéticas e as mantém atualizadas incrementalmente"""
+
+    def __init__(self, hubs: Sequence[str] = DEFAULT_HUBS, anchors: Optional[Sequence[str]] = None):
+        """anchors: só deriva pares com origem ou destino nessas moedas (None = todos)"""
+        self.hubs = tuple(hubs)
+        self.anchors = None if anchors is None else frozenset(anchors)
+        self._structure = None
+        self._prev_rates = array('d')
+
+        # Derivações em cache: posição sintética -> (pos. perna 1, pos. perna 2)
+        self._legs: List[Tuple[int, int]] = []
+        self._hub_of: List[str] = []
+        # Índice de dependência: posição da aresta direta -> posições sintéticas
+        self._dependents: Dict[int, List[int]] = {}
+
+        self._syn_from = array('i')
+        self._syn_to = array('i')
+        self._syn_rates = array('d')
+
+        self.last_recomputed = 0
+
+    def _rebuild(self, snapshot: RateSnapshot):
+        """Recalcula todas as derivações (mudança de estrutura)"""
+        from_idx, to_idx, rates = snapshot.from_idx, snapshot.to_idx, snapshot.rates
+        direct = set()
+        incoming: Dict[int, List[int]] = {}
+        outgoing: Dict[int, List[int]] = {}
+        for k in range(snapshot.direct_count):
+            i, j = from_idx[k], to_idx[k]
+            direct.add((i, j))
+            outgoing.setdefault(i, []).append(k)
+            incoming.setdefault(j, []).append(k)
+
+        self._legs = []
+        self._hub_of = []
+        self._dependents = {}
+        self._syn_from = array('i')
+        self._syn_to = array('i')
+        self._syn_rates = array('d')
+        derived: Set[Tuple[int, int]] = set()
+        anchored = None if self.anchors is None else {
+            snapshot.currency_idx[c] for c in self.anchors if c in snapshot.currency_idx
+        }
+
+        for hub in self.hubs:
+            h = snapshot.currency_idx.get(hub)
+            if h is None:
+                continue
+            for k1 in incoming.get(h, ()):
+                a = from_idx[k1]
+                for k2 in outgoing.get(h, ()):
+                    b = to_idx[k2]
+                    if a == b or (a, b) in direct or (a, b) in derived:
+                        continue
+                    if anchored is not None and a not in anchored and b not in anchored:
+                        continue
+                    derived.add((a, b))
+                    position = len(self._legs)
+                    self._legs.append((k1, k2))
+                    self._hub_of.append(hub)
+                    self._dependents.setdefault(k1, []).append(position)
+                    self._dependents.setdefault(k2, []).append(position)
+                    self._syn_from.append(a)
+                    self._syn_to.append(b)
+                    self._syn_rates.append(rates[k1] * rates[k2])
+
+        self.last_recomputed = len(self._legs)
+
+    def _refresh(self, rates: array):
+        """Recalcula apenas as derivações cujas pernas mudaram de taxa"""
+        previous = self._prev_rates
+        dirty = set()
+        for k, rate in enumerate(rates):
+            if rate != previous[k]:
+                dirty.update(self._dependents.get(k, ()))
+
+        for position in dirty:
+            k1, k2 = self._legs[position]
+            self._syn_rates[position] = rates[k1] * rates[k2]
+        self.last_recomputed = len(dirty)
+
+    def apply(self, snapshot: RateSnapshot) -> RateSnapshot:
+        """Retorna o snapshot com as arestas sintéticas acrescentadas ao final"""
+        direct_rates = snapshot.rates[:snapshot.direct_count]
+        structure = (tuple(snapshot.currencies),
+                     snapshot.from_idx[:snapshot.direct_count].tobytes(),
+                     snapshot.to_idx[:snapshot.direct_count].tobytes())
+
+        if structure != self._structure:
+            self._structure = structure
+            self._rebuild(snapshot)
+        else:
+            self._refresh(direct_rates)
+        self._prev_rates = array('d', direct_rates)
+
+        if not self._legs:
+            return snapshot
+
+        return RateSnapshot(
+            snapshot.currencies,
+            snapshot.from_idx[:snapshot.direct_count] + self._syn_from,
+            snapshot.to_idx[:snapshot.direct_count] + self._syn_to,
+            direct_rates + self._syn_rates,
+            timestamp=snapshot.timestamp,
+            direct_count=snapshot.direct_count,
+        )
+
+    def synthetic_rates(self, snapshot: RateSnapshot) -> Dict[str, Dict]:
+        """Pares derivados 'A/B' -> taxa e hub usado (nomes de moedas)"""
+        names = snapshot.currencies
+        return {
+            f"{names[a]}/{names[b]}": {'rate': rate, 'hub': hub}
+            for a, b, rate, hub in zip(self._syn_from, self._syn_to, self._syn_rates, self._hub_of)
+        }
@@ -1,19 +1,37 @@
-import requests
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import time
 import json
 from typing import List, Tuple, Dict, Optional
 from datetime import datetime
 import threading
 from collections import defaultdict
+from backend.fetch_scheduler import FetchScheduler
+from backend.rate_snapshot import RateSnapshot, RateSnapshotBuilder
+from backend.profiler import PROFILER
+from backend.event_bus import EventBus, COALESCE
+from backend.structured_logging import get_logger
+
+logger = get_logger('fetcher')
 
 class CryptoDataFetcher:
-    def __init__(self):
+    def __init__(self, rate_limits: Optional[Dict] = None, max_quote_age: float = 60):
+        # Import tardio: requests só é carregado quando um fetcher é criado
+        import requests
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Últimas cotações por fonte: {fonte: {par: (preço, timestamp)}}; o lock
+        # protege o cache lido pela análise (thread do barramento) durante a coleta
         self.cache = {}
+        self._lock = threading.Lock()
         self.cache_timeout = 10  # segundos
+        # Idade máxima de uma cotação reaproveitada entre coletas
+        self.max_quote_age = max_quote_age
+        self.scheduler = FetchScheduler(rate_limits)
 
     def fetch_coingecko_prices(self) -> Dict[str, float]:
         """Busca preços do CoinGecko (sem API key necessária) - Endpoint otimizado"""
@@ -25,12 +43,16 @@ class CryptoDataFetcher:
                 'vs_currencies': 'usd,brl,eur'
             }
 
+            if not self.scheduler.try_acquire('CoinGecko'):
+                return {}
+
             response = self.session.get(url, params=params, timeout=10)
             
             # Verificar rate limit
             if response.status_code == 429:
-                print("⚠️  Rate limit do CoinGecko atingido, aguardando...")
-                time.sleep(30)
+                logger.warning("⚠️  Rate limit do CoinGecko atingido, pausando fonte por 30s...",
+                               extra={'source': 'CoinGecko'})
+                self.scheduler.penalize('CoinGecko', 30)
                 return {}
                 
             response.raise_for_status()
@@ -59,7 +81,7 @@ class CryptoDataFetcher:
             return prices
 
         except Exception as e:
-            print(f"⚠️  Erro ao buscar CoinGecko: {e}")
+            logger.warning("⚠️  Erro ao buscar CoinGecko: %s", e, extra={'source': 'CoinGecko'})
             return {}
 
     def fetch_binance_prices(self) -> Dict[str, float]:
@@ -72,12 +94,27 @@ class CryptoDataFetcher:
                 'BTCBRL', 'ETHBRL', 'BNBBRL', 'ADABRL'
             ]
             
+            symbol_pairs = {
+                symbol: f"{symbol[:-4]}/USDT" if symbol.endswith('USDT') else f"{symbol[:-3]}/BRL"
+                for symbol in relevant_symbols
+            }
+            ordered_pairs = self.scheduler.prioritize(symbol_pairs.values())
+            pair_symbols = {pair: symbol for symbol, pair in symbol_pairs.items()}
+
             prices = {}
-            for symbol in relevant_symbols:
+            for pair in ordered_pairs:
+                symbol = pair_symbols[pair]
+                # Cada símbolo é uma requisição: parar quando a cota acabar
+                if not self.scheduler.try_acquire('Binance'):
+                    break
                 try:
                     url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
                     response = self.session.get(url, timeout=5)
                     
+                    if response.status_code == 429:
+                        self.scheduler.penalize('Binance', 60)
+                        break
+
                     if response.status_code == 200:
                         data = response.json()
                         
@@ -95,7 +132,7 @@ class CryptoDataFetcher:
             return prices
 
         except Exception as e:
-            print(f"⚠️  Erro ao buscar Binance: {e}")
+            logger.warning("⚠️  Erro ao buscar Binance: %s", e, extra={'source': 'Binance'})
             return {}
 
     def fetch_coinbase_prices(self) -> Dict[str, float]:
@@ -105,33 +142,39 @@ class CryptoDataFetcher:
             pairs = ['BTC-USD', 'ETH-USD', 'BTC-BRL', 'ETH-BRL', 'BTC-EUR', 'ETH-EUR']
             prices = {}
 
-            for pair in pairs:
+            for formatted_pair in self.scheduler.prioritize(p.replace('-', '/') for p in pairs):
+                # Cota controlada pelo token bucket da Coinbase
+                if not self.scheduler.try_acquire('Coinbase'):
+                    break
                 try:
+                    pair = formatted_pair.replace('/', '-')
                     url = f"https://api.coinbase.com/v2/prices/{pair}/spot"
                     response = self.session.get(url, timeout=5)
                     
+                    if response.status_code == 429:
+                        self.scheduler.penalize('Coinbase', 60)
+                        break
+
                     if response.status_code == 200:
                         data = response.json()
                         if 'data' in data and 'amount' in data['data']:
-                            formatted_pair = pair.replace('-', '/')
                             prices[formatted_pair] = float(data['data']['amount'])
                     
-                    # Pequena pausa para evitar rate limit
-                    time.sleep(0.1)
-                    
                 except Exception as e:
                     continue
 
             return prices
 
         except Exception as e:
-            print(f"⚠️  Erro ao buscar Coinbase: {e}")
+            logger.warning("⚠️  Erro ao buscar Coinbase: %s", e, extra={'source': 'Coinbase'})
             return {}
 
     def fetch_awesomeapi_rates(self) -> Dict[str, float]:
         """Busca taxas de câmbio fiat da AwesomeAPI (especializada em BRL)"""
         try:
             url = "https://economia.awesomeapi.com.br/json/last/USD-BRL,EUR-BRL,BTC-BRL"
+            if not self.scheduler.try_acquire('AwesomeAPI'):
+                return {}
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
@@ -154,13 +197,15 @@ class CryptoDataFetcher:
             return prices
 
         except Exception as e:
-            print(f"⚠️  Erro ao buscar AwesomeAPI: {e}")
+            logger.warning("⚠️  Erro ao buscar AwesomeAPI: %s", e, extra={'source': 'AwesomeAPI'})
             return {}
 
-    def fetch_all_rates(self) -> List[Tuple[str, str, float]]:
-        """Busca todas as taxas de todas as exchanges com gestão de erro melhorada"""
-        all_prices = {}
+    def fetch_all_rates(self) -> RateSnapshot:
+        """Busca todas as taxas de todas as exchanges com gestão de erro melhorada
 
+        Cada fonte só é consultada quando seu token bucket permite; as demais
+        contribuem com as últimas cotações ainda dentro de max_quote_age.
+        """
         # Fontes prioritárias - APIs mais confiáveis
         sources = [
             ('CoinGecko', self.fetch_coingecko_prices),
@@ -168,95 +213,143 @@ class CryptoDataFetcher:
             ('AwesomeAPI', self.fetch_awesomeapi_rates),
             ('Coinbase', self.fetch_coinbase_prices)
         ]
+        # Ordem fixa para a mescla (fontes posteriores prevalecem em pares repetidos)
+        merge_order = [name for name, _ in sources]
+
+        # Fontes com pares mais voláteis/desatualizados primeiro
+        sources.sort(key=lambda s: self.scheduler.source_priority(s[0]), reverse=True)
 
+        fetch_started = time.time()
+        pending = 0
         for source_name, fetch_func in sources:
+            if not self.scheduler.is_ready(source_name):
+                pending += 1
+                continue
             try:
-                print(f"🔍 Coletando dados de {source_name}...")
-                prices = fetch_func()
+                logger.debug("🔍 Coletando dados de %s...", source_name)
+                with PROFILER.stage(f"fetch.{source_name}"):
+                    prices = fetch_func()
                 if prices:
-                    all_prices.update(prices)
-                    print(f"✅ {source_name}: {len(prices)} pares obtidos")
+                    self._store_quotes(source_name, prices)
+                    PROFILER.increment(f"fetch.{source_name}.success")
+                    logger.debug("✅ %s: %d pares obtidos", source_name, len(prices),
+                                 extra={'source': source_name, 'pairs': len(prices)})
                 else:
-                    print(f"⚠️  {source_name}: Nenhum dado obtido")
-                    
-                # Pausa estratégica entre requests
-                time.sleep(1)
+                    PROFILER.increment(f"fetch.{source_name}.empty")
+                    logger.debug("⚠️  %s: Nenhum dado obtido", source_name, extra={'source': source_name})
                 
             except Exception as e:
-                print(f"❌ {source_name}: {e}")
+                PROFILER.increment(f"fetch.{source_name}.error")
+                logger.error("❌ %s: %s", source_name, e, extra={'source': source_name})
                 continue
 
-        # Converter para formato de taxa (from, to, rate)
-        rates = []
-        processed_pairs = set()
+        # Fontes aguardando token (backlog de coleta)
+        PROFILER.set_gauge("queue.fetch_pending", pending)
 
-        for pair, price in all_prices.items():
-            if '/' in pair:
-                from_curr, to_curr = pair.split('/')
+        with PROFILER.stage("fetch.normalize"):
+            all_prices = self._merge_cached_quotes(merge_order, fetch_started)
+            rates = self._build_snapshot(all_prices)
+        return rates
 
-                # Adicionar taxa direta
-                if (from_curr, to_curr) not in processed_pairs and price > 0:
-                    rates.append((from_curr, to_curr, price))
-                    processed_pairs.add((from_curr, to_curr))
+    def _build_snapshot(self, all_prices: Dict[str, float]) -> RateSnapshot:
+        """Converte cotações 'A/B' mescladas em snapshot compacto com inversas"""
+        # Converter para snapshot compacto (from, to, rate) em arrays paralelos
+        builder = RateSnapshotBuilder()
 
-                # Adicionar taxa inversa se possível
-                if price > 0 and (to_curr, from_curr) not in processed_pairs:
-                    inverse_price = 1.0 / price
-                    rates.append((to_curr, from_curr, inverse_price))
-                    processed_pairs.add((to_curr, from_curr))
+        # Ordem estável entre verificações: permite cache incremental a jusante
+        for pair in sorted(all_prices):
+            price = all_prices[pair]
+            if '/' in pair and price > 0:
+                from_curr, to_curr = pair.split('/')
+
+                # Adicionar taxa direta e inversa (duplicatas são ignoradas)
+                builder.add(from_curr, to_curr, price)
+                builder.add(to_curr, from_curr, 1.0 / price)
 
-        print(f"📊 Total de {len(rates)} taxas coletadas de {len(processed_pairs)} pares únicos")
+        rates = builder.build()
+        logger.debug("📊 Total de %d taxas coletadas de %d pares únicos", len(rates), builder.pair_count)
         return rates
 
-    def get_market_summary(self, rates: List[Tuple[str, str, float]]) -> Dict:
-        """Gera resumo do mercado"""
-        currencies = set()
-        crypto_currencies = set()
-        fiat_currencies = set()
-        
-        fiat_list = ['USD', 'BRL', 'EUR', 'GBP', 'JPY', 'CAD']
-        
-        for from_curr, to_curr, _ in rates:
-            currencies.add(from_curr)
-            currencies.add(to_curr)
-            
-            if from_curr in fiat_list:
-                fiat_currencies.add(from_curr)
-            else:
-                crypto_currencies.add(from_curr)
-                
-            if to_curr in fiat_list:
-                fiat_currencies.add(to_curr)
-            else:
-                crypto_currencies.add(to_curr)
-
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'total_currencies': len(currencies),
-            'total_crypto': len(crypto_currencies),
-            'total_fiat': len(fiat_currencies),
-            'total_pairs': len(rates),
-            'crypto_currencies': sorted(list(crypto_currencies)),
-            'fiat_currencies': sorted(list(fiat_currencies))
-        }
+    def _store_quotes(self, source_name: str, prices: Dict[str, float]):
+        """Guarda as cotações da fonte e informa o agendador"""
+        now = time.time()
+        with self._lock:
+            quotes = self.cache.setdefault(source_name, {})
+            for pair, price in prices.items():
+                quotes[pair] = (price, now)
+        self.scheduler.record_prices(source_name, prices)
+
+    def _merge_cached_quotes(self, source_names: List[str], fresh_since: float = 0.0) -> Dict[str, float]:
+        """Combina as últimas cotações válidas de todas as fontes
+
+        Cotações anteriores a fresh_since contam como acertos de cache.
+        """
+        now = time.time()
+        all_prices = {}
+        hits = misses = 0
+        with self._lock:
+            for source_name in source_names:
+                quotes = self.cache.get(source_name, {})
+                for pair, (price, timestamp) in list(quotes.items()):
+                    if now - timestamp > self.max_quote_age:
+                        del quotes[pair]
+                        continue
+                    all_prices[pair] = price
+                    if timestamp < fresh_since:
+                        hits += 1
+                    else:
+                        misses += 1
+
+        PROFILER.increment("quote_cache.hits", hits)
+        PROFILER.increment("quote_cache.misses", misses)
+        return all_prices
+
+    def venue_quotes(self) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """Cópia das cotações por fonte {fonte: {par: (preço, timestamp)}}, sem mescla"""
+        with self._lock:
+            return {source: dict(quotes) for source, quotes in self.cache.items()}
+
+    def restore_quotes(self, quotes: Dict[str, Dict[str, Tuple[float, float]]]):
+        """Recarrega cotações por fonte de um checkpoint (as vencidas saem na próxima mescla)"""
+        with self._lock:
+            for source, source_quotes in quotes.items():
+                self.cache.setdefault(source, {}).update(source_quotes)
+
+    def get_market_summary(self, rates) -> Dict:
+        """Gera resumo do mercado (pré-calculado no snapshot)"""
+        return RateSnapshot.from_tuples(rates).summary()
 
 
 class RealTimeDataManager:
     """Gerenciador de dados em tempo real com cache e atualização periódica"""
 
-    def __init__(self, update_interval: int = 60):  # Aumentado para 60s para evitar rate limit
-        self.fetcher = CryptoDataFetcher()
+    def __init__(self, update_interval: int = 60, rate_limits: Optional[Dict] = None,
+                 fetcher=None):
+        # Rate limit por fonte fica a cargo do FetchScheduler do fetcher;
+        # fetcher alternativo (ex.: SimulatedFetcher) substitui as APIs reais
+        self.fetcher = fetcher or CryptoDataFetcher(rate_limits=rate_limits)
         self.update_interval = update_interval
-        self.current_rates = []
+        self.current_rates = RateSnapshot.empty()
         self.market_summary = {}
         self.last_update = None
         self.is_running = False
         self.update_thread = None
-        self.callbacks = []
+        # Cada callback roda na sua própria fila/thread: consumidores lentos
+        # não atrasam a próxima coleta
+        self.bus = EventBus()
+
+    def add_callback(self, callback, policy: str = COALESCE, maxsize: int = 16,
+                     name: Optional[str] = None):
+        """Adiciona callback para quando dados forem atualizados
 
-    def add_callback(self, callback):
-        """Adiciona callback para quando dados forem atualizados"""
-        self.callbacks.append(callback)
+        policy define o que fazer quando o callback não acompanha as coletas:
+        'coalesce' (só o snapshot mais recente), 'drop_oldest' ou 'block'.
+        """
+        return self.bus.subscribe('rates', callback, name=name, maxsize=maxsize, policy=policy)
+
+    def wait_for_consumers(self, timeout: Optional[float] = None) -> bool:
+        """Espera os callbacks processarem as atualizações já publicadas"""
+        return self.bus.drain(timeout)
 
     def start(self):
         """Inicia atualização contínua em background"""
@@ -264,14 +357,14 @@ class RealTimeDataManager:
             self.is_running = True
             self.update_thread = threading.Thread(target=self._update_loop, daemon=True)
             self.update_thread.start()
-            print(f"🚀 Manager de dados iniciado (atualização a cada {self.update_interval}s)")
+            logger.info("🚀 Manager de dados iniciado (atualização a cada %ss)", self.update_interval)
 
     def stop(self):
         """Para atualização"""
         self.is_running = False
         if self.update_thread:
             self.update_thread.join(timeout=5)
-        print("🛑 Manager de dados parado")
+        logger.info("🛑 Manager de dados parado")
 
     def _update_loop(self):
         """Loop de atualização contínua"""
@@ -281,39 +374,64 @@ class RealTimeDataManager:
                 # Intervalo adaptativo baseado no sucesso da coleta
                 time.sleep(self.update_interval)
             except Exception as e:
-                print(f"❌ Erro no loop de atualização: {e}")
+                logger.exception("❌ Erro no loop de atualização: %s", e)
                 # Espera mais longe em caso de erro
                 time.sleep(30)
 
     def update_data(self):
         """Atualiza dados uma vez"""
-        print(f"\n🔄 Atualizando dados... {datetime.now().strftime('%H:%M:%S')}")
+        logger.debug("🔄 Atualizando dados...")
 
         try:
             # Buscar taxas
-            self.current_rates = self.fetcher.fetch_all_rates()
+            with PROFILER.stage("fetch.total"):
+                self.current_rates = self.fetcher.fetch_all_rates()
             self.market_summary = self.fetcher.get_market_summary(self.current_rates)
             self.last_update = datetime.now()
 
-            print(f"✅ Atualização completa: {len(self.current_rates)} taxas, "
-                  f"{self.market_summary['total_currencies']} moedas "
-                  f"({self.market_summary['total_crypto']} cripto, "
-                  f"{self.market_summary['total_fiat']} fiat)")
+            logger.info("✅ Atualização completa: %d taxas, %d moedas (%d cripto, %d fiat)",
+                        len(self.current_rates), self.market_summary['total_currencies'],
+                        self.market_summary['total_crypto'], self.market_summary['total_fiat'],
+                        extra={'rates': len(self.current_rates),
+                               'currencies': self.market_summary['total_currencies']})
 
-            # Notificar callbacks
-            for callback in self.callbacks:
-                try:
-                    callback(self.current_rates, self.market_summary)
-                except Exception as e:
-                    print(f"⚠️  Erro em callback: {e}")
+            # Notificar callbacks (entrega assíncrona, uma fila por assinante)
+            self.bus.publish('rates', self.current_rates, self.market_summary)
 
         except Exception as e:
-            print(f"❌ Erro ao atualizar dados: {e}")
+            logger.exception("❌ Erro ao atualizar dados: %s", e)
+
+    def restore(self, rates: RateSnapshot, quotes: Dict[str, Dict[str, Tuple[float, float]]]):
+        """Assume o estado de um checkpoint como dados atuais (sem notificar callbacks)"""
+        self.fetcher.restore_quotes(quotes)
+        self.current_rates = rates
+        self.market_summary = self.fetcher.get_market_summary(rates)
+        self.last_update = rates.timestamp
 
-    def get_current_data(self) -> Tuple[List[Tuple[str, str, float]], Dict]:
+    def republish(self):
+        """Entrega os dados atuais aos callbacks de novo (ex.: após restaurar um checkpoint)"""
+        self.bus.publish('rates', self.current_rates, self.market_summary)
+
+    def get_current_data(self) -> Tuple[RateSnapshot, Dict]:
         """Retorna dados atuais"""
         return self.current_rates, self.market_summary
 
+    def get_refresh_rates(self) -> Dict[str, float]:
+        """Taxa de atualização alcançada por par (atualizações por segundo)"""
+        return self.fetcher.scheduler.get_refresh_rates()
+
+    def get_venue_quotes(self) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """Cotações por fonte para o scanner de spreads entre exchanges"""
+        return self.fetcher.venue_quotes()
+
+    def get_volatility(self) -> Dict[str, float]:
+        """Volatilidade recente por par (média móvel de |log-retorno|)"""
+        return self.fetcher.scheduler.get_volatility()
+
+    def get_edge_priority(self) -> Dict[Tuple[str, str], float]:
+        """Prioridade por aresta (volatilidade × liquidez) para a detecção com prazo"""
+        return self.fetcher.scheduler.edge_priority()
+
     def save_to_file(self, filepath: str = "market_data.json"):
         """Salva dados atuais em arquivo JSON"""
         import os
@@ -331,7 +449,7 @@ class RealTimeDataManager:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
 
-        print(f"💾 Dados salvos em: {filepath}")
+        logger.info("💾 Dados salvos em: %s", filepath)
         return filepath
 
 
@@ -344,6 +462,9 @@ def print_market_summary(rates, summary):
 
 
 if __name__ == "__main__":
+    from backend.structured_logging import setup_logging
+    setup_logging(verbose=True)
+
     # Teste do fetcher
     print("🧪 Testando coleta de dados em tempo real...\n")
     print("📋 Fontes configuradas: CoinGecko, Binance, Coinbase, AwesomeAPI")
@@ -354,6 +475,7 @@ if __name__ == "__main__":
     # Atualização única para teste
     print("\n🔍 Executando primeira coleta...")
     manager.update_data()
+    manager.wait_for_consumers()
 
     rates, summary = manager.get_current_data()
 
@@ -0,0 +1,132 @@
+"""
+Barramento de eventos interno (pub/sub) com fila limitada por assinante
+
+Quem publica nunca executa o trabalho dos consumidores: cada assinante tem sua
+própria fila e thread, então um consumidor lento (detecção, gravação de
+arquivos) não atrasa a próxima coleta nem os demais consumidores.
+
+Política quando a fila do assinante está cheia:
+- 'drop_oldest': descarta o evento mais antigo da fila;
+- 'coalesce': mantém só o evento mais recente (estado substitui estado);
+- 'block': quem publica espera até haver espaço.
+
+Métricas por assinante no PROFILER: profundidade (queue.bus.<nome>), atraso
+entre publicação e entrega (estágio bus.<nome>.lag) e eventos descartados
+(bus.<nome>.dropped), exportadas em /metrics. As assinaturas duram o processo
+inteiro (threads daemon), então não há cancelamento.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from backend.profiler import PROFILER
+from backend.structured_logging import get_logger
+
+logger = get_logger('bus')
+
+DROP_OLDEST = 'drop_oldest'
+COALESCE = 'coalesce'
+BLOCK = 'block'
+
+POLICIES = (DROP_OLDEST, COALESCE, BLOCK)
+
+
+class Subscription:
+    """Fila limitada + thread de entrega de um assinante"""
+
+    def __init__(self, name: str, handler: Callable, maxsize: int = 16, policy: str = COALESCE):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de fila desconhecida: {policy}")
+        self.name = name
+        self.handler = handler
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._busy = False
+
+        self._thread = threading.Thread(target=self._run, name=f"bus-{name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, args: tuple):
+        """Enfileira um evento aplicando a política de transbordo"""
+        with self._cond:
+            if self.policy == COALESCE and self._queue:
+                PROFILER.increment(f"bus.{self.name}.dropped", len(self._queue))
+                self._queue.clear()
+            elif len(self._queue) >= self.maxsize:
+                if self.policy == BLOCK:
+                    while len(self._queue) >= self.maxsize:
+                        self._cond.wait()
+                else:
+                    self._queue.popleft()
+                    PROFILER.increment(f"bus.{self.name}.dropped")
+            self._queue.append((time.perf_counter(), args))
+            PROFILER.set_gauge(f"queue.bus.{self.name}", len(self._queue))
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                published_at, args = self._queue.popleft()
+                self._busy = True
+                PROFILER.set_gauge(f"queue.bus.{self.name}", len(self._queue))
+                self._cond.notify_all()
+
+            PROFILER.record(f"bus.{self.name}.lag", time.perf_counter() - published_at)
+            try:
+                self.handler(*args)
+            except Exception as e:
+                logger.exception("⚠️  Erro no assinante %s: %s", self.name, e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Espera a fila esvaziar e o evento em andamento terminar"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+class EventBus:
+    """Tópicos nomeados, cada um com seus assinantes independentes"""
+
+    def __init__(self):
+        self._topics: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler: Callable, name: Optional[str] = None,
+                  maxsize: int = 16, policy: str = COALESCE) -> Subscription:
+        with self._lock:
+            subscribers = self._topics.setdefault(topic, [])
+            name = name or f"{topic}{len(subscribers)}"
+            subscription = Subscription(name, handler, maxsize, policy)
+            self._topics[topic] = subscribers + [subscription]
+        return subscription
+
+    def publish(self, topic: str, *args):
+        """Entrega args a todos os assinantes do tópico (sem executar os handlers aqui)"""
+        for subscription in self._topics.get(topic, ()):
+            subscription.offer(args)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Espera todos os assinantes processarem o que já foi publicado"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for subscribers in list(self._topics.values()):
+            for subscription in subscribers:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not subscription.wait_idle(remaining):
+                    return False
+        return True
@@ -0,0 +1,188 @@
+"""
+Agendador de coletas com token buckets por exchange
+
+Cada fonte de dados recebe um balde de tokens dimensionado pela sua cota de
+API gratuita. Uma requisição HTTP consome um token; quando o balde está vazio
+a fonte é pulada e os últimos preços conhecidos continuam valendo. Pares mais
+voláteis (e mais desatualizados) são buscados primeiro.
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+
+# Janela (em segundos) usada para medir a taxa de atualização por par
+REFRESH_WINDOW = 60.0
+
+# Peso da última observação na média móvel exponencial de volatilidade
+VOLATILITY_ALPHA = 0.3
+
+
+class TokenBucket:
+    """Balde de tokens thread-safe (reabastecimento contínuo)"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        if now < self.blocked_until:
+            return
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consome tokens se houver saldo; nunca bloqueia"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def available(self) -> float:
+        """Tokens disponíveis no momento"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def penalize(self, seconds: float):
+        """Esvazia o balde e bloqueia por alguns segundos (ex.: HTTP 429)"""
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = time.monotonic() + seconds
+
+
+class FetchScheduler:
+    """Agenda coletas por fonte e prioriza pares voláteis"""
+
+    def __init__(self, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 refresh_window: float = REFRESH_WINDOW):
+        # Sem limites explícitos: os de config.FETCH_RATE_LIMITS ({} = sem limites)
+        limits = config.FETCH_RATE_LIMITS if rate_limits is None else rate_limits
+        self.buckets = {
+            source: TokenBucket(per_minute, burst)
+            for source, (per_minute, burst) in limits.items()
+        }
+        self.refresh_window = refresh_window
+        self.started_at = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._last_price: Dict[str, float] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._volatility: Dict[str, float] = defaultdict(float)
+        self._updates: Dict[str, deque] = defaultdict(deque)
+        self._source_pairs: Dict[str, set] = defaultdict(set)
+
+    # ----- Cotas -----
+
+    def try_acquire(self, source: str, tokens: float = 1.0) -> bool:
+        """Tenta consumir tokens da fonte (fontes sem limite sempre passam)"""
+        bucket = self.buckets.get(source)
+        return bucket is None or bucket.try_acquire(tokens)
+
+    def is_ready(self, source: str) -> bool:
+        """Indica se a fonte tem ao menos um token disponível"""
+        bucket = self.buckets.get(source)
+        return bucket is None or bucket.available() >= 1.0
+
+    def penalize(self, source: str, seconds: float):
+        """Bloqueia a fonte após um rate limit explícito da API"""
+        bucket = self.buckets.get(source)
+        if bucket is not None:
+            bucket.penalize(seconds)
+
+    # ----- Prioridade -----
+
+    def pair_priority(self, pair: str, now: Optional[float] = None) -> float:
+        """Prioridade = tempo sem atualizar × (1 + volatilidade em bps)"""
+        now = time.monotonic() if now is None else now
+        last_seen = self._last_seen.get(pair)
+        if last_seen is None:
+            return math.inf
+        volatility_bps = self._volatility[pair] * 1e4
+        return (now - last_seen) * (1.0 + volatility_bps)
+
+    def prioritize(self, pairs: Iterable[str]) -> List[str]:
+        """Ordena pares do mais prioritário ao menos prioritário"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(pairs, key=lambda p: self.pair_priority(p, now), reverse=True)
+
+    def source_priority(self, source: str) -> float:
+        """Maior prioridade entre os pares já vistos na fonte"""
+        now = time.monotonic()
+        with self._lock:
+            pairs = self._source_pairs.get(source)
+            if not pairs:
+                return math.inf
+            return max(self.pair_priority(p, now) for p in pairs)
+
+    # ----- Observações -----
+
+    def record_prices(self, source: str, prices: Dict[str, float]):
+        """Registra preços recebidos e atualiza volatilidade/frequência"""
+        now = time.monotonic()
+        with self._lock:
+            self._source_pairs[source].update(prices)
+            for pair, price in prices.items():
+                previous = self._last_price.get(pair)
+                if previous and price > 0:
+                    change = abs(math.log(price / previous))
+                    self._volatility[pair] = (VOLATILITY_ALPHA * change +
+                                              (1 - VOLATILITY_ALPHA) * self._volatility[pair])
+                self._last_price[pair] = price
+                self._last_seen[pair] = now
+
+                updates = self._updates[pair]
+                updates.append(now)
+                while updates and now - updates[0] > self.refresh_window:
+                    updates.popleft()
+
+    def get_refresh_rates(self) -> Dict[str, float]:
+        """Taxa de atualização alcançada por par (atualizações por segundo)"""
+        now = time.monotonic()
+        window = min(self.refresh_window, max(1.0, now - self.started_at))
+        with self._lock:
+            rates = {}
+            for pair, updates in self._updates.items():
+                while updates and now - updates[0] > self.refresh_window:
+                    updates.popleft()
+                rates[pair] = len(updates) / window
+            return rates
+
+    def get_volatility(self) -> Dict[str, float]:
+        """Volatilidade recente por par (média móvel de |log-retorno|)"""
+        with self._lock:
+            return dict(self._volatility)
+
+    def edge_priority(self) -> Dict[Tuple[str, str], float]:
+        """Prioridade de busca por aresta (ambos os sentidos de cada par)
+
+        (1 + volatilidade em bps) × número de fontes que cotam o par: pares
+        que mais se moveram e os mais líquidos vêm primeiro.
+        """
+        with self._lock:
+            liquidity: Dict[str, int] = defaultdict(int)
+            for pairs in self._source_pairs.values():
+                for pair in pairs:
+                    liquidity[pair] += 1
+
+            priority = {}
+            for pair, sources in liquidity.items():
+                if '/' not in pair:
+                    continue
+                base, quote = pair.split('/', 1)
+                score = (1.0 + self._volatility[pair] * 1e4) * sources
+                priority[(base, quote)] = score
+                priority[(quote, base)] = score
+            return priority
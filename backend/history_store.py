@@ -0,0 +1,213 @@
+"""
+Histórico de verificações com retenção em camadas e memória limitada
+
+Cada verificação vira um registro binário de tamanho fixo (32 bytes) em um
+buffer circular. Três camadas, todas alimentadas pelas verificações brutas:
+- raw: cada verificação da última hora;
+- minute: agregados de 1 minuto pelo último dia;
+- hour: agregados de 1 hora pelo último mês.
+
+Memória e arquivo são limitados pela capacidade das camadas. O arquivo binário
+(history.bin) só precisa ser regravado quando um agregado é fechado.
+"""
+
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Registro: início (epoch), amostras, soma de oportunidades, lucro máx., soma dos lucros
+RECORD = struct.Struct('<dIIdd')
+
+FILE_MAGIC = b'AHS1'
+FILE_HEADER = struct.Struct('<4sI')
+TIER_HEADER = struct.Struct('<I')
+
+# (nome, resolução em segundos, retenção em segundos, capacidade em registros)
+# A capacidade de raw assume uma verificação por segundo; verificações mais
+# rápidas descartam as mais antigas antes de completar a hora
+TIERS = (
+    ('raw', 0, 3600, 3600),
+    ('minute', 60, 86400, 1440),
+    ('hour', 3600, 30 * 86400, 720),
+)
+
+
+class RecordRing:
+    """Buffer circular de registros RECORD sobre um bytearray pré-alocado"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity * RECORD.size)
+        self._next = 0
+        self.size = 0
+
+    def append(self, record: Tuple):
+        RECORD.pack_into(self._buffer, self._next * RECORD.size, *record)
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Tuple]:
+        """Registros do mais antigo para o mais recente"""
+        start = (self._next - self.size) % self.capacity
+        for k in range(self.size):
+            yield RECORD.unpack_from(self._buffer, ((start + k) % self.capacity) * RECORD.size)
+
+    def last(self, n: int) -> List[Tuple]:
+        n = min(n, self.size)
+        start = (self._next - n) % self.capacity
+        return [RECORD.unpack_from(self._buffer, ((start + k) % self.capacity) * RECORD.size)
+                for k in range(n)]
+
+
+class _Tier:
+    """Camada de retenção: buffer circular + agregado em aberto"""
+
+    def __init__(self, name: str, resolution: int, retention: int, capacity: int):
+        self.name = name
+        self.resolution = resolution
+        self.retention = retention
+        self.ring = RecordRing(capacity)
+        # Agregado em aberto: [início, amostras, soma_count, lucro_máx, soma_lucro]
+        self.pending: Optional[list] = None
+
+    def add(self, timestamp: float, count: int, top_profit: float) -> bool:
+        """Registra uma verificação; True se um registro novo foi fechado"""
+        if not self.resolution:
+            self.ring.append((timestamp, 1, count, top_profit, top_profit))
+            return True
+
+        bucket = timestamp - timestamp % self.resolution
+        closed = False
+        if self.pending is not None and self.pending[0] != bucket:
+            self.ring.append(tuple(self.pending))
+            self.pending = None
+            closed = True
+        if self.pending is None:
+            self.pending = [bucket, 0, 0, top_profit, 0.0]
+        pending = self.pending
+        pending[1] += 1
+        pending[2] += count
+        pending[3] = max(pending[3], top_profit)
+        pending[4] += top_profit
+        return closed
+
+    def records(self, now: float) -> List[Tuple]:
+        """Registros dentro da retenção, incluindo o agregado em aberto"""
+        cutoff = now - self.retention
+        records = [r for r in self.ring if r[0] >= cutoff]
+        if self.pending is not None:
+            records.append(tuple(self.pending))
+        return records
+
+
+class HistoryStore:
+    """Histórico em camadas raw/minute/hour com tamanho fixo"""
+
+    def __init__(self, tiers=TIERS):
+        self.tiers: Dict[str, _Tier] = {spec[0]: _Tier(*spec) for spec in tiers}
+
+    def append(self, count: int, top_profit: float, timestamp: Optional[float] = None) -> bool:
+        """Registra uma verificação; True se algum agregado foi fechado (hora de salvar)"""
+        if timestamp is None:
+            timestamp = time.time()
+        closed = False
+        for tier in self.tiers.values():
+            if tier.add(timestamp, count, top_profit) and tier.resolution:
+                closed = True
+        return closed
+
+    def __len__(self) -> int:
+        return len(self.tiers['raw'].ring)
+
+    def recent(self, n: int) -> List[Dict]:
+        """Últimas n verificações no formato legado do history.json"""
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'count': count,
+                'top_profit': top_profit
+            }
+            for ts, _, count, top_profit, _ in self.tiers['raw'].ring.last(n)
+        ]
+
+    def series(self, tier: str = 'minute', now: Optional[float] = None) -> List[Dict]:
+        """Série de uma camada dentro da retenção (médias e máximos por intervalo)"""
+        if now is None:
+            now = time.time()
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(ts).isoformat(),
+                'samples': samples,
+                'avg_count': count_sum / samples if samples else 0,
+                'max_profit': profit_max,
+                'avg_top_profit': profit_sum / samples if samples else 0
+            }
+            for ts, samples, count_sum, profit_max, profit_sum in self.tiers[tier].records(now)
+        ]
+
+    def totals(self) -> Dict:
+        """Verificações, oportunidades e maior lucro ao longo de toda a retenção"""
+        now = time.time()
+        records = self.tiers['hour'].records(now)
+        return {
+            'checks': sum(r[1] for r in records),
+            'opportunities': sum(r[2] for r in records),
+            'max_profit': max((r[3] for r in records), default=0)
+        }
+
+    # ----- Persistência -----
+
+    def save(self, path: str):
+        """Grava todas as camadas (registros fechados) em arquivo binário de tamanho limitado"""
+        chunks = [FILE_HEADER.pack(FILE_MAGIC, len(self.tiers))]
+        for tier in self.tiers.values():
+            records = list(tier.ring)
+            chunks.append(TIER_HEADER.pack(len(records)))
+            chunks.extend(RECORD.pack(*r) for r in records)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(chunks))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'HistoryStore':
+        """Lê um arquivo gravado por save(); camadas ausentes ficam vazias"""
+        store = cls()
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        magic, tier_count = FILE_HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"Arquivo de histórico inválido: {path}")
+
+        offset = FILE_HEADER.size
+        for tier in list(store.tiers.values())[:tier_count]:
+            (count,) = TIER_HEADER.unpack_from(data, offset)
+            offset += TIER_HEADER.size
+            for _ in range(count):
+                tier.ring.append(RECORD.unpack_from(data, offset))
+                offset += RECORD.size
+
+        # Agregados em aberto não são gravados: reconstruí-los a partir das
+        # verificações brutas posteriores ao último intervalo fechado
+        raw = store.tiers['raw'].ring
+        for tier in store.tiers.values():
+            if not tier.resolution:
+                continue
+            closed = tier.ring.last(1)
+            since = closed[0][0] + tier.resolution if closed else float('-inf')
+            for ts, _, count, top_profit, _ in raw:
+                if ts >= since:
+                    tier.add(ts, count, top_profit)
+        return store
+
+    def extend(self, other: 'HistoryStore'):
+        """Reaplica as verificações brutas de outro store (mais recentes) neste"""
+        for ts, _, count, top_profit, _ in other.tiers['raw'].ring:
+            self.append(count, top_profit, ts)
@@ -0,0 +1,84 @@
+"""
+Pesos em espaço logarítmico com precisão controlada
+
+O peso de uma aresta é w = -log(rate), calculado uma única vez quando a taxa é
+gravada. O lucro de um ciclo é a soma dos logs (math.fsum, soma compensada
+exata) e só volta ao espaço linear via expm1, então produtos muito próximos
+de 1.0 são comparados sem o erro acumulado de multiplicar taxas de 1e-6 a 1e5.
+"""
+
+import math
+from typing import Iterable, List, Sequence, Tuple
+
+INF = float('inf')
+
+# Tolerância padrão (em log-lucro) para comparações; ~1e-10 % do valor
+DEFAULT_TOLERANCE = 1e-12
+
+
+def log_weight(rate: float) -> float:
+    """Peso -log(rate); arestas inexistentes (rate <= 0) valem +inf"""
+    return -math.log(rate) if rate > 0 else INF
+
+
+def cycle_log_profit(weights: Iterable[float]) -> float:
+    """log do produto das taxas do ciclo, com soma compensada"""
+    return -math.fsum(weights)
+
+
+def profit_percent(log_profit: float) -> float:
+    """Lucro percentual preciso mesmo para produtos próximos de 1.0"""
+    return math.expm1(log_profit) * 100
+
+
+def threshold_log_profit(threshold_percent: float) -> float:
+    """Converte um lucro mínimo em % para o espaço logarítmico"""
+    return math.log1p(threshold_percent / 100)
+
+
+def compare_log_profit(a: float, b: float, tolerance: float = DEFAULT_TOLERANCE) -> int:
+    """-1, 0 ou 1; diferenças dentro da tolerância são consideradas iguais"""
+    if abs(a - b) <= tolerance:
+        return 0
+    return 1 if a > b else -1
+
+
+def exceeds_threshold(log_profit: float, threshold_percent: float,
+                      tolerance: float = DEFAULT_TOLERANCE) -> bool:
+    """True se o lucro supera o limiar por mais que a tolerância"""
+    return compare_log_profit(log_profit, threshold_log_profit(threshold_percent), tolerance) > 0
+
+
+class LogWeightStore:
+    """Matriz n×n de pesos -log(rate) mantida a cada escrita de taxa"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.weights = [[INF] * n for _ in range(n)]
+        for i in range(n):
+            self.weights[i][i] = 0.0
+        self._edges = None
+
+    def set(self, i: int, j: int, rate: float):
+        """Grava o peso de i→j (chamado sempre que a taxa muda)"""
+        self.weights[i][j] = log_weight(rate) if i != j else 0.0
+        self._edges = None
+
+    def edges(self) -> List[Tuple[int, int, float]]:
+        """Lista (u, v, w) das arestas existentes, reconstruída só após escritas"""
+        if self._edges is None:
+            self._edges = [
+                (i, j, w)
+                for i, row in enumerate(self.weights)
+                for j, w in enumerate(row)
+                if i != j and w != INF
+            ]
+        return self._edges
+
+    def cycle_log_profit(self, cycle: Sequence[int]) -> float:
+        """log-lucro de um ciclo de índices (fechado ou não)"""
+        nodes = list(cycle[:-1]) if len(cycle) > 1 and cycle[0] == cycle[-1] else list(cycle)
+        weights = self.weights
+        return cycle_log_profit(
+            weights[nodes[k]][nodes[(k + 1) % len(nodes)]] for k in range(len(nodes))
+        )
@@ -0,0 +1,306 @@
+"""
+Simulador de mercado sintético para testes de carga ponta a ponta (offline)
+
+Gera centenas de ativos com preços correlacionados (um fator de mercado comum
++ ruído idiossincrático, em log-preço), cotados em várias exchanges fictícias
+com pequenas diferenças entre elas. Periodicamente injeta ciclos de arbitragem
+BRL → A → B → BRL com lucro conhecido (gabarito) por algumas verificações.
+
+SimulatedFetcher tem a mesma interface usada de CryptoDataFetcher, então pode
+ser entregue ao RealTimeDataManager / ArbitrageEngine no lugar das APIs reais.
+run_load_test mede verificações por segundo e recall de detecção.
+
+O recall é medido com a detecção com prazo (DETECTION_BUDGET_SECONDS), que
+fecha triângulos a partir da base antes do Bellman-Ford. Na configuração
+padrão (sem prazo) o Bellman-Ford só devolve os ciclos que restam no grafo de
+predecessores, raramente os triângulos injetados, e a busca de triângulos só
+roda abaixo de MAX_CURRENCIES_FOR_TRIANGLE_SEARCH moedas: o recall seria ~0
+mesmo com 20 ativos. --no-budget mede a configuração atual mesmo assim.
+
+Uso: python backend/market_simulator.py [ativos] [verificações] [--serve] [--no-budget]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+import config
+from backend.fetch_scheduler import FetchScheduler
+from backend.opportunity_tracker import CycleKey, cycle_key
+from backend.profiler import PROFILER
+from backend.rate_snapshot import RateSnapshot, RateSnapshotBuilder, BASE_CURRENCY
+from backend.structured_logging import get_logger
+
+logger = get_logger('simulator')
+
+DEFAULT_VENUES = ('SimExA', 'SimExB', 'SimExC', 'SimExD')
+
+# Prazo da detecção no teste de carga (segundos); ver docstring do módulo
+LOAD_TEST_DETECTION_BUDGET = 0.5
+
+
+class InjectedCycle:
+    """Distorção de um par que cria o ciclo BRL → base → quote → BRL"""
+
+    __slots__ = ('pair', 'factor', 'expires', 'key')
+
+    def __init__(self, pair: int, factor: float, expires: int, key: CycleKey):
+        self.pair = pair
+        self.factor = factor
+        self.expires = expires
+        self.key = key
+
+
+class SyntheticMarket:
+    """Processos de preço correlacionados cotados em várias exchanges"""
+
+    def __init__(self, assets: int = 200, venues: Sequence[str] = DEFAULT_VENUES,
+                 cross_pairs: int = 300, volatility: float = 0.0005, correlation: float = 0.6,
+                 venue_noise: float = 0.00002, inject_every: int = 5, cycle_profit: float = 0.5,
+                 cycle_lifetime: int = 3, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+
+        # Moedas: BRL (referência, preço fixo 1), USDT e os ativos sintéticos
+        self.currencies = [BASE_CURRENCY, 'USDT'] + [f"S{i:03d}" for i in range(assets)]
+        self.venues = list(venues)
+        n = len(self.currencies)
+
+        # Log-preço em BRL de cada moeda
+        self.log_prices = np.empty(n)
+        self.log_prices[0] = 0.0
+        self.log_prices[1] = math.log(5.0)
+        self.log_prices[2:] = rng.uniform(math.log(0.01), math.log(300000.0), assets)
+
+        # Exposição ao fator de mercado (BRL fixo, USDT quase estável)
+        self.betas = np.r_[0.0, 0.02, rng.uniform(0.5, 1.5, assets)]
+        self.idio = np.r_[0.0, 0.02, np.ones(assets)]
+        self.volatility = volatility
+        self.correlation = correlation
+        self.venue_noise = venue_noise
+
+        # Pares: cada ativo contra BRL e USDT, mais cruzamentos aleatórios entre ativos
+        pairs = [(i, 0) for i in range(2, n)] + [(i, 1) for i in range(2, n)] + [(1, 0)]
+        seen = set(pairs)
+        cross_pairs = min(cross_pairs, assets * (assets - 1) // 2)
+        while len(pairs) < 2 * assets + 1 + cross_pairs:
+            a, b = rng.choice(np.arange(2, n), 2, replace=False)
+            if (a, b) not in seen and (b, a) not in seen:
+                seen.add((a, b))
+                pairs.append((int(a), int(b)))
+        self.pair_base = np.array([p[0] for p in pairs])
+        self.pair_quote = np.array([p[1] for p in pairs])
+        self.pair_names = [f"{self.currencies[a]}/{self.currencies[b]}" for a, b in pairs]
+        self.cross_start = 2 * assets + 1
+
+        # Cobertura: cada par em pelo menos uma exchange (máscara venues × pares)
+        coverage = rng.random((len(self.venues), len(pairs))) < 0.6
+        coverage[rng.integers(0, len(self.venues), len(pairs)), np.arange(len(pairs))] = True
+        self.coverage = coverage
+
+        self.inject_every = inject_every
+        self.cycle_profit = cycle_profit
+        self.cycle_lifetime = cycle_lifetime
+        self.injected: List[InjectedCycle] = []
+        self.tick = 0
+
+    def step(self) -> Dict[str, Dict[str, float]]:
+        """Avança uma verificação e retorna {exchange: {par: preço}}"""
+        rng = self.rng
+        self.tick += 1
+
+        market = rng.standard_normal()
+        shocks = self.volatility * (math.sqrt(self.correlation) * self.betas * market +
+                                    math.sqrt(1 - self.correlation) * self.idio *
+                                    rng.standard_normal(len(self.currencies)))
+        shocks[0] = 0.0
+        self.log_prices += shocks
+
+        self._update_injections()
+
+        mids = np.exp(self.log_prices[self.pair_base] - self.log_prices[self.pair_quote])
+        for cycle in self.injected:
+            mids[cycle.pair] *= cycle.factor
+
+        # Cotação de cada exchange = mid × ruído próprio (venues × pares)
+        quotes = mids * np.exp(self.venue_noise * rng.standard_normal(self.coverage.shape))
+        names = self.pair_names
+        return {
+            venue: {names[p]: float(quotes[v, p]) for p in np.flatnonzero(self.coverage[v])}
+            for v, venue in enumerate(self.venues)
+        }
+
+    def _update_injections(self):
+        self.injected = [c for c in self.injected if c.expires > self.tick]
+        if not self.inject_every or self.tick % self.inject_every or self.cross_start >= len(self.pair_names):
+            return
+
+        pair = int(self.rng.integers(self.cross_start, len(self.pair_names)))
+        if any(c.pair == pair for c in self.injected):
+            return
+        a = self.currencies[self.pair_base[pair]]
+        b = self.currencies[self.pair_quote[pair]]
+        # a→b mais caro por (1 + lucro): BRL → a → b → BRL rende exatamente o lucro injetado
+        self.injected.append(InjectedCycle(
+            pair, 1 + self.cycle_profit / 100, self.tick + self.cycle_lifetime,
+            cycle_key([BASE_CURRENCY, a, b, BASE_CURRENCY])
+        ))
+        logger.debug("💉 Ciclo injetado: %s → %s → %s → %s (%.2f%%)",
+                     BASE_CURRENCY, a, b, BASE_CURRENCY, self.cycle_profit)
+
+    @property
+    def ground_truth(self) -> Set[CycleKey]:
+        """Ciclos injetados ativos na última verificação"""
+        return {c.key for c in self.injected}
+
+
+class SimulatedFetcher:
+    """Substituto de CryptoDataFetcher alimentado por um SyntheticMarket"""
+
+    def __init__(self, market: Optional[SyntheticMarket] = None, rate_limits: Optional[Dict] = None,
+                 max_quote_age: float = 60):
+        self.market = market or SyntheticMarket()
+        self.max_quote_age = max_quote_age
+        self.cache = {}
+        self._lock = threading.Lock()
+        self.scheduler = FetchScheduler(rate_limits or {})
+
+    def fetch_all_rates(self) -> RateSnapshot:
+        """Uma verificação do mercado sintético, no mesmo formato do fetcher real"""
+        with PROFILER.stage("fetch.Simulator"):
+            venue_prices = self.market.step()
+
+        now = time.time()
+        with PROFILER.stage("fetch.normalize"):
+            all_prices = {}
+            for venue in self.market.venues:
+                prices = venue_prices[venue]
+                with self._lock:
+                    self.cache[venue] = {pair: (price, now) for pair, price in prices.items()}
+                self.scheduler.record_prices(venue, prices)
+                # Mesma semântica da mescla real: exchanges posteriores prevalecem
+                all_prices.update(prices)
+
+            builder = RateSnapshotBuilder()
+            for pair in sorted(all_prices):
+                price = all_prices[pair]
+                from_curr, to_curr = pair.split('/')
+                builder.add(from_curr, to_curr, price)
+                builder.add(to_curr, from_curr, 1.0 / price)
+            return builder.build()
+
+    def venue_quotes(self) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        with self._lock:
+            return {venue: dict(quotes) for venue, quotes in self.cache.items()}
+
+    def restore_quotes(self, quotes: Dict[str, Dict[str, Tuple[float, float]]]):
+        with self._lock:
+            for venue, venue_quotes in quotes.items():
+                self.cache.setdefault(venue, {}).update(venue_quotes)
+
+    def get_market_summary(self, rates) -> Dict:
+        return RateSnapshot.from_tuples(rates).summary()
+
+
+def run_load_test(ticks: int = 100, tick_rate: Optional[float] = None, serve: bool = False,
+                  output_dir: Optional[str] = None,
+                  detection_budget: Optional[float] = LOAD_TEST_DETECTION_BUDGET,
+                  **market_options) -> Dict:
+    """Roda o pipeline completo sobre o simulador e mede vazão e recall
+
+    tick_rate limita as verificações por segundo (None = o mais rápido possível);
+    serve=True também sobe o servidor web lendo os resultados gerados;
+    detection_budget substitui DETECTION_BUDGET_SECONDS durante o teste
+    (None = usa a configuração atual, que sem prazo não acha os ciclos injetados).
+    """
+    previous_budget = config.DETECTION_BUDGET_SECONDS
+    if detection_budget is not None:
+        config.DETECTION_BUDGET_SECONDS = detection_budget
+    try:
+        return _run_load_test(ticks, tick_rate, serve, output_dir, market_options)
+    finally:
+        config.DETECTION_BUDGET_SECONDS = previous_budget
+
+
+def _run_load_test(ticks: int, tick_rate: Optional[float], serve: bool,
+                   output_dir: Optional[str], market_options: Dict) -> Dict:
+    from backend.arbitrage_engine import ArbitrageEngine
+
+    if output_dir is None:
+        # Servidor lê de data/ na raiz do projeto; sem servidor, diretório temporário
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output_dir = os.path.join(root, 'data') if serve else tempfile.mkdtemp(prefix='arbitrage-sim-')
+    fetcher = SimulatedFetcher(SyntheticMarket(**market_options))
+    engine = ArbitrageEngine(output_dir=output_dir, fetcher=fetcher)
+    engine.is_running = True
+
+    if serve:
+        from server import start_server
+        threading.Thread(target=start_server, daemon=True,
+                         kwargs={'status_provider': engine.status,
+                                 'opportunity_provider': lambda: engine.opportunity_index}).start()
+
+    injected = detected = 0
+    started = time.perf_counter()
+    for tick in range(ticks):
+        tick_started = time.perf_counter()
+        engine.data_manager.update_data()
+        engine.data_manager.wait_for_consumers()
+
+        truth = fetcher.market.ground_truth
+        injected += len(truth)
+        detected += len(truth & engine.tracker.active.keys())
+
+        if tick_rate:
+            time.sleep(max(0.0, 1.0 / tick_rate - (time.perf_counter() - tick_started)))
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'ticks': ticks,
+        'currencies': len(fetcher.market.currencies),
+        'venues': len(fetcher.market.venues),
+        'pairs': len(fetcher.market.pair_names),
+        'elapsed_seconds': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'injected_cycles': injected,
+        'detected_cycles': detected,
+        'recall': detected / injected if injected else 1.0,
+        'detection_budget': config.DETECTION_BUDGET_SECONDS,
+        'output_dir': output_dir,
+    }
+    PROFILER.set_gauge("simulator.ticks_per_second", report['ticks_per_second'])
+    PROFILER.set_gauge("simulator.recall", report['recall'])
+    return report
+
+
+def main():
+    """Teste de carga: ativos e verificações pela linha de comando"""
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    assets = int(args[0]) if args else 200
+    ticks = int(args[1]) if len(args) > 1 else 20
+
+    print("🧪 Simulador de mercado: %d ativos, %d verificações" % (assets, ticks))
+    budget = None if '--no-budget' in sys.argv else LOAD_TEST_DETECTION_BUDGET
+    report = run_load_test(ticks=ticks, assets=assets, serve='--serve' in sys.argv,
+                           detection_budget=budget)
+
+    print("=" * 60)
+    print(f"   Moedas/pares/exchanges: {report['currencies']}/{report['pairs']}/{report['venues']}")
+    print(f"   Verificações por segundo: {report['ticks_per_second']:.2f}")
+    print(f"   Prazo da detecção: {report['detection_budget'] or 'sem prazo'}")
+    print(f"   Recall de ciclos injetados: {report['recall'] * 100:.1f}% "
+          f"({report['detected_cycles']}/{report['injected_cycles']})")
+    print(f"   Resultados em: {report['output_dir']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
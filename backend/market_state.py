@@ -0,0 +1,56 @@
+"""
+Estado agregado do mercado, calculado junto com a construção do grafo
+
+Reúne o que antes era dividido entre get_arbitrage_statistics (varredura n×n
+da matriz a cada verificação) e get_market_summary (nova varredura da lista de
+taxas). Os contadores são obtidos enquanto a matriz é preenchida e os
+dicionários derivados são montados só quando alguém os pede.
+"""
+
+from typing import Dict, Optional
+
+from backend.rate_snapshot import RateSnapshot
+
+
+class MarketState:
+    """Agregados do grafo atual servidos de forma preguiçosa"""
+
+    def __init__(self, snapshot: RateSnapshot, available_pairs: int):
+        self.snapshot = snapshot
+        self.total_currencies = len(snapshot.currencies)
+        self.available_pairs = available_pairs
+        self.synthetic_pairs = len(snapshot) - snapshot.direct_count
+        self._statistics: Optional[Dict] = None
+        self._summary: Optional[Dict] = None
+
+    @classmethod
+    def empty(cls) -> 'MarketState':
+        return cls(RateSnapshot.empty(), 0)
+
+    @property
+    def total_possible_pairs(self) -> int:
+        n = self.total_currencies
+        return n * (n - 1)
+
+    @property
+    def coverage_percent(self) -> float:
+        total = self.total_possible_pairs
+        return (self.available_pairs / total * 100) if total > 0 else 0
+
+    def statistics(self) -> Dict:
+        """Mesmo formato de CryptoArbitrageMonitor.get_arbitrage_statistics"""
+        if self._statistics is None:
+            self._statistics = {
+                'total_currencies': self.total_currencies,
+                'total_possible_pairs': self.total_possible_pairs,
+                'available_pairs': self.available_pairs,
+                'synthetic_pairs': self.synthetic_pairs,
+                'coverage_percent': self.coverage_percent
+            }
+        return self._statistics
+
+    def summary(self) -> Dict:
+        """Resumo de moedas (cripto/fiat) do grafo usado na detecção"""
+        if self._summary is None:
+            self._summary = self.snapshot.summary()
+        return self._summary
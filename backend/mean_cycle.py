@@ -0,0 +1,132 @@
+"""
+Ciclo de custo médio mínimo (iteração de políticas de Howard) sobre -log(rate)
+
+Bellman-Ford encontra *um* ciclo negativo; aqui buscamos o ciclo com o menor
+peso médio por aresta, ou seja, o maior lucro por perna. Pernas a mais
+significam mais taxas e mais risco de execução, então essa é a métrica que
+importa para escolher o ciclo.
+
+Howard mantém uma política (um sucessor por moeda). Cada iteração:
+1. avalia a política: cada moeda chega a um ciclo do grafo da política, cujo
+   custo médio é η(v), e recebe um potencial x(v);
+2. melhora a política com numpy sobre a matriz n×n de pesos: primeiro trocando
+   para sucessores que levam a ciclos de η menor; se nenhum η melhora, trocando
+   para sucessores que reduzem x(v) = w(v, u) - η + x(u).
+Sem trocas, a política é ótima e o menor η é o custo médio mínimo do grafo.
+Na prática converge em poucas iterações, bem menos que as n passadas do
+Bellman-Ford.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Tolerância das comparações de η e potenciais (espaço logarítmico)
+EPSILON = 1e-12
+
+MAX_ITERATIONS = 1000
+
+
+def _prune_dead_ends(weights: np.ndarray) -> np.ndarray:
+    """Índices das moedas que podem estar em ciclos (têm saída para outra moeda viva)"""
+    alive = np.ones(len(weights), dtype=bool)
+    finite = np.isfinite(weights)
+    while True:
+        has_exit = (finite & alive[None, :]).any(axis=1) & alive
+        if (has_exit == alive).all():
+            return np.flatnonzero(alive)
+        alive = has_exit
+
+
+def _evaluate(policy: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[Tuple[float, List[int]]]]:
+    """η e potencial x de cada nó sob a política, e os ciclos do grafo da política"""
+    n = len(policy)
+    eta = np.empty(n)
+    x = np.empty(n)
+    state = np.zeros(n, dtype=np.int8)  # 0 = novo, 1 = no caminho atual, 2 = resolvido
+    cycles = []
+
+    for start in range(n):
+        if state[start]:
+            continue
+        path = []
+        v = start
+        while not state[v]:
+            state[v] = 1
+            path.append(v)
+            v = policy[v]
+
+        if state[v] == 1:
+            # Novo ciclo: de v até o fim do caminho
+            cycle = path[path.index(v):]
+            mean = float(np.mean(weights[cycle, policy[cycle]]))
+            cycles.append((mean, cycle))
+            # Raiz do ciclo com x = 0; potenciais dos demais nós do ciclo de trás para frente
+            eta[cycle] = mean
+            x[cycle[0]] = 0.0
+            for k in range(len(cycle) - 1, 0, -1):
+                u = cycle[k]
+                x[u] = weights[u, policy[u]] - mean + x[policy[u]]
+            state[cycle] = 2
+            path = path[:len(path) - len(cycle)]
+
+        # Nós que levam ao ciclo herdam η e acumulam o potencial
+        for u in reversed(path):
+            eta[u] = eta[policy[u]]
+            x[u] = weights[u, policy[u]] - eta[u] + x[policy[u]]
+            state[u] = 2
+
+    return eta, x, cycles
+
+
+def min_mean_cycles(weights: np.ndarray,
+                    max_iterations: int = MAX_ITERATIONS) -> List[Tuple[float, List[int]]]:
+    """Ciclos da política ótima de Howard, do menor custo médio para o maior
+
+    weights: matriz n×n de -log(rate) com +inf onde não há par (diagonal ignorada).
+    Retorna [(custo médio por aresta, [nós do ciclo])]; o primeiro é o ciclo de
+    custo médio mínimo do grafo. Lista vazia se o grafo não tem ciclos.
+    """
+    weights = np.array(weights, dtype=float)
+    np.fill_diagonal(weights, np.inf)
+
+    nodes = _prune_dead_ends(weights)
+    if len(nodes) == 0:
+        return []
+    w = weights[np.ix_(nodes, nodes)]
+    finite = np.isfinite(w)
+
+    # Política inicial: aresta mais barata de cada nó
+    policy = np.argmin(w, axis=1)
+    rows = np.arange(len(nodes))
+
+    for _ in range(max_iterations):
+        eta, x, cycles = _evaluate(policy, w)
+
+        # Passo 1: sucessor que leva ao ciclo de menor η
+        eta_via = np.where(finite, eta[None, :], np.inf)
+        best = np.argmin(eta_via, axis=1)
+        improve = eta_via[rows, best] < eta - EPSILON
+        if improve.any():
+            policy = np.where(improve, best, policy)
+            continue
+
+        # Passo 2: mesmo η, menor potencial
+        same_eta = finite & (np.abs(eta[None, :] - eta[:, None]) <= EPSILON)
+        value = np.where(same_eta, w - eta[:, None] + x[None, :], np.inf)
+        best = np.argmin(value, axis=1)
+        improve = value[rows, best] < x - EPSILON
+        if not improve.any():
+            break
+        policy = np.where(improve, best, policy)
+
+    return sorted(
+        ((mean, [int(nodes[v]) for v in cycle]) for mean, cycle in cycles),
+        key=lambda c: c[0]
+    )
+
+
+def min_mean_cycle(weights: np.ndarray) -> Optional[Tuple[float, List[int]]]:
+    """(custo médio mínimo por aresta, ciclo) ou None se não há ciclos"""
+    cycles = min_mean_cycles(weights)
+    return cycles[0] if cycles else None
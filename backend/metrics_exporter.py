@@ -0,0 +1,118 @@
+"""
+Exportador de métricas no formato texto do Prometheus
+
+Renderiza um snapshot do profiler (PROFILER.snapshot() ou o metrics.json
+salvo pelo engine) sem tocar em locks do caminho de detecção.
+"""
+
+import re
+from typing import Dict, List
+
+from backend.profiler import HISTOGRAM_BUCKETS
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+PREFIX = 'arbitrage'
+
+_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def _metric_name(name: str) -> str:
+    return f"{PREFIX}_{_INVALID_CHARS.sub('_', name)}"
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _render_histograms(stages: Dict, lines: List[str]):
+    name = f"{PREFIX}_stage_duration_seconds"
+    lines.append(f"# HELP {name} Duração de cada estágio do pipeline")
+    lines.append(f"# TYPE {name} histogram")
+    for stage in sorted(stages):
+        entry = stages[stage]
+        buckets = entry.get('buckets')
+        if not buckets:
+            continue
+        label = _label(stage)
+        cumulative = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS, buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{label}",le="{_format_bound(bound)}"}} {cumulative}')
+        cumulative += buckets[-1]
+        lines.append(f'{name}_bucket{{stage="{label}",le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{label}"}} {entry["total_seconds"]}')
+        lines.append(f'{name}_count{{stage="{label}"}} {entry["count"]}')
+
+    errors = f"{PREFIX}_stage_errors_total"
+    lines.append(f"# HELP {errors} Execuções de estágio que terminaram com exceção")
+    lines.append(f"# TYPE {errors} counter")
+    for stage in sorted(stages):
+        lines.append(f'{errors}{{stage="{_label(stage)}"}} {stages[stage]["errors"]}')
+
+
+def _render_counters(counters: Dict, lines: List[str]):
+    fetch_results = {}
+    plain = {}
+    for key, value in counters.items():
+        parts = key.split('.')
+        if len(parts) == 3 and parts[0] == 'fetch':
+            fetch_results[(parts[1], parts[2])] = value
+        else:
+            plain[key] = value
+
+    if fetch_results:
+        name = f"{PREFIX}_fetch_requests_total"
+        lines.append(f"# HELP {name} Coletas por fonte e resultado (success/empty/error)")
+        lines.append(f"# TYPE {name} counter")
+        for (source, result), value in sorted(fetch_results.items()):
+            lines.append(f'{name}{{source="{_label(source)}",result="{_label(result)}"}} {value}')
+
+    hits = counters.get('quote_cache.hits', 0)
+    misses = counters.get('quote_cache.misses', 0)
+    if hits or misses:
+        name = f"{PREFIX}_quote_cache_hit_ratio"
+        lines.append(f"# HELP {name} Fração das cotações servidas do cache desde o início")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {hits / (hits + misses)}")
+
+    for key in sorted(plain):
+        name = _metric_name(key) + '_total'
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {plain[key]}")
+
+
+def _render_gauges(gauges: Dict, lines: List[str]):
+    queues = {key[len('queue.'):]: value for key, value in gauges.items() if key.startswith('queue.')}
+    if queues:
+        name = f"{PREFIX}_queue_depth"
+        lines.append(f"# HELP {name} Itens aguardando em cada fila interna")
+        lines.append(f"# TYPE {name} gauge")
+        for queue in sorted(queues):
+            lines.append(f'{name}{{queue="{_label(queue)}"}} {queues[queue]}')
+
+    for key in sorted(gauges):
+        if key.startswith('queue.'):
+            continue
+        name = _metric_name(key)
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {gauges[key]}")
+
+
+def render_prometheus(snapshot: Dict) -> str:
+    """Converte um snapshot do profiler em texto de exposição do Prometheus"""
+    lines = []
+
+    name = f"{PREFIX}_uptime_seconds"
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name} {snapshot.get('uptime_seconds', 0)}")
+
+    _render_histograms(snapshot.get('stages', {}), lines)
+    _render_counters(snapshot.get('counters', {}), lines)
+    _render_gauges(snapshot.get('gauges', {}), lines)
+
+    return "\n".join(lines) + "\n"
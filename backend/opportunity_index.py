@@ -0,0 +1,113 @@
+"""
+Índice consultável do conjunto completo de oportunidades de uma verificação
+
+As oportunidades ficam ordenadas por lucro (maior primeiro), então um filtro
+de lucro mínimo/máximo é um intervalo contíguo de posições, achado por busca
+binária. Listas de posições (também em ordem de lucro) por número de pernas e
+por (moeda, pernas) respondem aos demais filtros: cada lista é recortada ao
+intervalo de lucro, o total sai do tamanho dos recortes e a página é montada
+mesclando os recortes só até offset + limit. Várias moedas são interseccionadas
+em conjuntos, partindo dos recortes da moeda mais rara.
+
+O índice é imutável: a engine cria um novo a cada verificação e o servidor
+consulta a referência atual sem locks.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class OpportunityIndex:
+    """Oportunidades ordenadas por lucro com listas de posições por pernas e moeda"""
+
+    def __init__(self, opportunities: Iterable[Dict] = ()):
+        self.items: List[Dict] = sorted(opportunities, key=lambda o: o['profit_percent'], reverse=True)
+        # Lucros negados (ordem crescente) para a busca binária do intervalo de lucro
+        self._neg_profits = [-opp['profit_percent'] for opp in self.items]
+        self.by_length: Dict[int, List[int]] = {}
+        self.by_currency: Dict[str, Dict[int, List[int]]] = {}
+        self._currency_sets: Dict[str, Set[int]] = {}
+
+        for pos, opp in enumerate(self.items):
+            path = opp['path']
+            legs = len(path) - 1
+            self.by_length.setdefault(legs, []).append(pos)
+            for currency in set(path):
+                self.by_currency.setdefault(currency, {}).setdefault(legs, []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _profit_range(self, min_profit: Optional[float], max_profit: Optional[float]) -> Tuple[int, int]:
+        """Intervalo [lo, hi) de posições com lucro entre os limites"""
+        lo = 0 if max_profit is None else bisect_left(self._neg_profits, -max_profit)
+        hi = len(self.items) if min_profit is None else bisect_right(self._neg_profits, -min_profit)
+        return lo, max(lo, hi)
+
+    def _currency_set(self, currency: str) -> Set[int]:
+        """Posições que passam pela moeda (montado na primeira consulta que precisa)"""
+        positions = self._currency_sets.get(currency)
+        if positions is None:
+            positions = {p for lists in self.by_currency.get(currency, {}).values() for p in lists}
+            self._currency_sets[currency] = positions
+        return positions
+
+    def query(self, currencies: Sequence[str] = (), min_profit: Optional[float] = None,
+              max_profit: Optional[float] = None, min_legs: Optional[int] = None,
+              max_legs: Optional[int] = None, offset: int = 0,
+              limit: int = DEFAULT_PAGE_SIZE) -> Dict:
+        """Oportunidades que passam em todos os filtros, em ordem de lucro, paginadas
+
+        currencies: o ciclo deve passar por todas as moedas indicadas.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        lo, hi = self._profit_range(min_profit, max_profit)
+
+        # Listas de posições por número de pernas (da moeda mais rara, se houver)
+        others: List[Set[int]] = []
+        if currencies:
+            counts = {c: sum(map(len, self.by_currency.get(c, {}).values())) for c in set(currencies)}
+            currencies = sorted(counts, key=counts.get)
+            lists = self.by_currency.get(currencies[0], {})
+            # Moedas presentes em todos os ciclos (ex.: a base) não filtram nada
+            others = [self._currency_set(c) for c in currencies[1:] if counts[c] < len(self.items)]
+        else:
+            lists = self.by_length
+
+        if not currencies and min_legs is None and max_legs is None:
+            # Só intervalo de lucro: a página é uma fatia direta
+            total = hi - lo
+            positions = range(lo + offset, min(hi, lo + offset + limit))
+        else:
+            # Recortes [início, fim) de cada lista, percorridos sem cópia
+            bounds = [
+                (positions, bisect_left(positions, lo), bisect_left(positions, hi))
+                for legs, positions in lists.items()
+                if (min_legs is None or legs >= min_legs) and (max_legs is None or legs <= max_legs)
+            ]
+            if others:
+                # Interseção em conjuntos; ordem de lucro = ordem das posições
+                candidates = set()
+                for positions, start, end in bounds:
+                    candidates.update(positions[start:end])
+                matches = sorted(candidates.intersection(*others))
+                total = len(matches)
+                positions = matches[offset:offset + limit]
+            else:
+                merged = heapq.merge(*(map(positions.__getitem__, range(start, end))
+                                       for positions, start, end in bounds))
+                total = sum(end - start for _, start, end in bounds)
+                positions = islice(merged, offset, offset + limit)
+
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'opportunities': [self.items[pos] for pos in positions],
+        }
@@ -0,0 +1,129 @@
+"""
+Rastreamento do ciclo de vida das oportunidades entre verificações
+
+Cada ciclo recebe uma chave canônica (rotação normalizada, direção mantida),
+então A→B→C→A e B→C→A→B são a mesma oportunidade, mas A→C→B→A não. O tracker
+emite apenas mudanças (open/update/close) e mantém primeira aparição e duração.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Variação mínima de lucro (pontos percentuais) para emitir 'update'
+PROFIT_CHANGE_TOLERANCE = 1e-4
+
+CycleKey = Tuple[str, ...]
+
+
+def cycle_key(path: Sequence[str]) -> CycleKey:
+    """Chave canônica do ciclo: sem o nó de fechamento, iniciando na menor moeda"""
+    nodes = list(path[:-1]) if len(path) > 1 and path[0] == path[-1] else list(path)
+    if not nodes:
+        return ()
+    start = min(range(len(nodes)), key=lambda i: nodes[i:] + nodes[:i])
+    return tuple(nodes[start:] + nodes[:start])
+
+
+class TrackedOpportunity:
+    """Estado de uma oportunidade ativa"""
+
+    __slots__ = ('key', 'opportunity', 'first_seen', 'last_seen', 'ticks', 'best_profit')
+
+    def __init__(self, key: CycleKey, opportunity: Dict, now: float):
+        self.key = key
+        self.opportunity = opportunity
+        self.first_seen = now
+        self.last_seen = now
+        self.ticks = 1
+        self.best_profit = opportunity['profit_percent']
+
+    @property
+    def duration(self) -> float:
+        return self.last_seen - self.first_seen
+
+    def to_event(self, event_type: str) -> Dict:
+        return {
+            'type': event_type,
+            'key': '→'.join(self.key),
+            'path': self.opportunity['path'],
+            'profit_percent': self.opportunity['profit_percent'],
+            'best_profit_percent': self.best_profit,
+            'first_seen': self.first_seen,
+            'duration_seconds': self.duration,
+            'ticks': self.ticks,
+        }
+
+
+class OpportunityTracker:
+    """Mantém o índice de oportunidades ativas e emite eventos de mudança"""
+
+    def __init__(self, tolerance: float = PROFIT_CHANGE_TOLERANCE):
+        self.tolerance = tolerance
+        self.active: Dict[CycleKey, TrackedOpportunity] = {}
+
+    def update(self, opportunities: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """Compara com o estado anterior e retorna os eventos open/update/close"""
+        now = time.time() if now is None else now
+        events = []
+        seen = set()
+
+        for opp in opportunities:
+            key = cycle_key(opp['path'])
+            if key in seen:
+                continue
+            seen.add(key)
+
+            tracked = self.active.get(key)
+            if tracked is None:
+                tracked = TrackedOpportunity(key, opp, now)
+                self.active[key] = tracked
+                events.append(tracked.to_event('open'))
+                continue
+
+            previous_profit = tracked.opportunity['profit_percent']
+            tracked.opportunity = opp
+            tracked.last_seen = now
+            tracked.ticks += 1
+            tracked.best_profit = max(tracked.best_profit, opp['profit_percent'])
+            if abs(opp['profit_percent'] - previous_profit) > self.tolerance:
+                events.append(tracked.to_event('update'))
+
+        for key in [k for k in self.active if k not in seen]:
+            tracked = self.active.pop(key)
+            tracked.last_seen = now
+            events.append(tracked.to_event('close'))
+
+        return events
+
+    def state(self) -> List[Dict]:
+        """Oportunidades ativas em formato serializável (checkpoint)"""
+        return [
+            {
+                'key': list(tracked.key),
+                'opportunity': tracked.opportunity,
+                'first_seen': tracked.first_seen,
+                'last_seen': tracked.last_seen,
+                'ticks': tracked.ticks,
+                'best_profit': tracked.best_profit,
+            }
+            for tracked in self.active.values()
+        ]
+
+    def restore(self, state: List[Dict]):
+        """Recarrega as oportunidades ativas gravadas por state() (sem emitir eventos)"""
+        for entry in state:
+            key = tuple(entry['key'])
+            tracked = TrackedOpportunity(key, entry['opportunity'], entry['first_seen'])
+            tracked.last_seen = entry['last_seen']
+            tracked.ticks = entry['ticks']
+            tracked.best_profit = entry['best_profit']
+            self.active[key] = tracked
+
+    def annotate(self, opportunities: List[Dict]) -> List[Dict]:
+        """Adiciona first_seen/duration_seconds às oportunidades ativas"""
+        for opp in opportunities:
+            tracked = self.active.get(cycle_key(opp['path']))
+            if tracked is not None:
+                opp['first_seen'] = tracked.first_seen
+                opp['duration_seconds'] = tracked.duration
+        return opportunities
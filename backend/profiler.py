@@ -0,0 +1,160 @@
+"""
+Profiler de estágios do pipeline (coleta → normalização → matriz → detecção → gravação)
+
+Timers de baixo custo (perf_counter) e contadores por estágio, com uma janela
+deslizante de amostras para percentis. Um único profiler global (PROFILER) é
+compartilhado por fetcher, manager, engine e servidor.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Optional
+
+# Número de amostras mantidas por estágio para cálculo de percentis
+DEFAULT_WINDOW = 1024
+
+PERCENTILES = (50, 90, 99)
+
+# Limites (em segundos) dos buckets cumulativos dos histogramas
+HISTOGRAM_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                     0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class StageStats:
+    """Contadores acumulados e janela de latências de um estágio"""
+
+    __slots__ = ('count', 'errors', 'total', 'max', 'last', 'samples', 'buckets')
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.samples = deque(maxlen=window)
+        # Contagem por bucket desde o início (último = +Inf)
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def add(self, seconds: float):
+        self.buckets[bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {f"p{p}": 0.0 for p in PERCENTILES}
+        last = len(ordered) - 1
+        return {f"p{p}": ordered[min(last, int(round(p / 100 * last)))] for p in PERCENTILES}
+
+
+class _StageTimer:
+    """Context manager que mede um estágio e registra no profiler"""
+
+    __slots__ = ('profiler', 'name', 'start', 'elapsed')
+
+    def __init__(self, profiler: 'StageProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.profiler.record(self.name, self.elapsed, failed=exc_type is not None)
+        return False
+
+
+class StageProfiler:
+    """Coleta latências por estágio e contadores nomeados"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.started_at = time.time()
+        self._stages: Dict[str, StageStats] = {}
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> _StageTimer:
+        """Uso: `with PROFILER.stage('update_rates'): ...`"""
+        return _StageTimer(self, name)
+
+    def _get(self, name: str) -> StageStats:
+        stats = self._stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stages.setdefault(name, StageStats(self.window))
+        return stats
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        """Registra uma medição (também usado para tempos medidos externamente)"""
+        stats = self._get(name)
+        stats.add(seconds)
+        if failed:
+            stats.errors += 1
+
+    def increment(self, name: str, value: float = 1):
+        """Incrementa um contador nomeado (coleta e detecção incrementam em threads diferentes)"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Define o valor atual de um medidor (ex.: tamanho de fila)"""
+        self._gauges[name] = value
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def gauges(self) -> Dict[str, float]:
+        return dict(self._gauges)
+
+    def snapshot(self) -> Dict:
+        """Estado atual em formato serializável (JSON)"""
+        stages = {}
+        for name, stats in list(self._stages.items()):
+            entry = {
+                'count': stats.count,
+                'errors': stats.errors,
+                'total_seconds': stats.total,
+                'mean_seconds': stats.total / stats.count if stats.count else 0.0,
+                'max_seconds': stats.max,
+                'last_seconds': stats.last,
+                'buckets': list(stats.buckets),
+            }
+            entry.update({f"{key}_seconds": value
+                          for key, value in stats.percentiles().items()})
+            stages[name] = entry
+
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'stages': stages,
+            'counters': self.counters(),
+            'gauges': dict(self._gauges),
+        }
+
+    def format_report(self, snapshot: Optional[Dict] = None) -> str:
+        """Tabela legível para o log periódico"""
+        snapshot = snapshot or self.snapshot()
+        lines = [f"{'Estágio':<28}{'n':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'máx ms':>10}"]
+        for name in sorted(snapshot['stages']):
+            s = snapshot['stages'][name]
+            lines.append(f"{name:<28}{s['count']:>7}"
+                         f"{s['p50_seconds'] * 1000:>10.2f}{s['p90_seconds'] * 1000:>10.2f}"
+                         f"{s['p99_seconds'] * 1000:>10.2f}{s['max_seconds'] * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+# Profiler global compartilhado pelo pipeline
+PROFILER = StageProfiler()
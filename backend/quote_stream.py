@@ -0,0 +1,439 @@
+"""
+Coleta distribuída: nós fetcher enviam cotações a um engine central via TCP
+
+Cada nó é dono de um subconjunto de fontes (e opcionalmente de pares) e envia
+as cotações normalizadas ao processo central, que as mescla como se fossem do
+seu próprio cache. Assim o rate limit por IP e a latência de rede deixam de
+ser de uma única máquina.
+
+Protocolo binário com prefixo de tamanho (little-endian):
+    frame  = [tamanho uint32][corpo]
+    corpo  = [versão u8][tipo u8][nó u16][seq u64][enviado_em f64][payload]
+    HELLO     payload = nome do nó (utf-8)
+    SYMBOLS   payload = N × [id u32][len u8][fonte][len u8][par]
+    QUOTES    payload = N × [id u32][preço f64]
+    HEARTBEAT payload vazio
+
+seq cresce a cada mensagem do nó (inclusive entre reconexões); o central
+detecta lacunas (mensagens perdidas) e reinícios do nó (seq volta para trás).
+Símbolos são reenviados a cada conexão.
+
+Uso (o central escuta só em localhost; [host:]porta amplia, ex.: 0.0.0.0:9100):
+    python backend/quote_stream.py central [[host:]porta]
+    python backend/quote_stream.py node <id> <fontes separadas por vírgula> [host:porta]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from backend.crypto_data_fetcher import CryptoDataFetcher
+from backend.profiler import PROFILER
+from backend.rate_snapshot import RateSnapshot
+from backend.structured_logging import get_logger
+
+logger = get_logger('quote_stream')
+
+PROTOCOL_VERSION = 1
+
+HELLO = 1
+SYMBOLS = 2
+QUOTES = 3
+HEARTBEAT = 4
+
+FRAME_HEADER = struct.Struct('<I')
+BODY_HEADER = struct.Struct('<BBHQd')
+SYMBOL_ID = struct.Struct('<IB')
+QUOTE = struct.Struct('<Id')
+
+# Maior frame aceito (bytes); acima disso a conexão é considerada corrompida
+MAX_FRAME_SIZE = 1024 * 1024
+
+# Cotações por mensagem QUOTES
+MAX_QUOTES_PER_FRAME = 4096
+
+DEFAULT_PORT = 9100
+
+# O central não autentica os nós: só escuta fora do localhost se pedido
+DEFAULT_HOST = '127.0.0.1'
+
+# Backoff máximo entre tentativas de reconexão de um nó (segundos)
+MAX_RECONNECT_BACKOFF = 30.0
+
+
+class ProtocolError(Exception):
+    """Frame inválido recebido de um nó"""
+
+
+# ----- Codificação -----
+
+class QuoteEncoder:
+    """Serializa mensagens de um nó, numerando-as e mantendo a tabela de símbolos"""
+
+    def __init__(self, node_id: int):
+        self.node_id = node_id
+        self.seq = 0
+        self._symbols: Dict[Tuple[str, str], int] = {}
+        self._announced: Set[int] = set()
+
+    def _frame(self, msg_type: int, payload: bytes = b'') -> bytes:
+        self.seq += 1
+        body = BODY_HEADER.pack(PROTOCOL_VERSION, msg_type, self.node_id, self.seq, time.time()) + payload
+        return FRAME_HEADER.pack(len(body)) + body
+
+    def reset_connection(self):
+        """Nova conexão: o central precisa receber os símbolos de novo"""
+        self._announced.clear()
+
+    def hello(self, name: str) -> bytes:
+        return self._frame(HELLO, name.encode('utf-8'))
+
+    def heartbeat(self) -> bytes:
+        return self._frame(HEARTBEAT)
+
+    def quotes(self, source: str, prices: Dict[str, float]) -> bytes:
+        """Frames SYMBOLS (só os ainda não anunciados) + QUOTES para as cotações"""
+        new_symbols = []
+        records = []
+        for pair, price in prices.items():
+            key = (source, pair)
+            symbol_id = self._symbols.setdefault(key, len(self._symbols))
+            if symbol_id not in self._announced:
+                self._announced.add(symbol_id)
+                src, name = source.encode('utf-8'), pair.encode('utf-8')
+                new_symbols.append(SYMBOL_ID.pack(symbol_id, len(src)) + src +
+                                   struct.pack('<B', len(name)) + name)
+            records.append(QUOTE.pack(symbol_id, price))
+
+        frames = []
+        if new_symbols:
+            frames.append(self._frame(SYMBOLS, b''.join(new_symbols)))
+        for start in range(0, len(records), MAX_QUOTES_PER_FRAME):
+            frames.append(self._frame(QUOTES, b''.join(records[start:start + MAX_QUOTES_PER_FRAME])))
+        return b''.join(frames)
+
+
+# ----- Decodificação -----
+
+def read_frame(stream) -> Optional[bytes]:
+    """Lê um corpo de frame de um arquivo binário; None no fim da conexão"""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length < BODY_HEADER.size or length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Tamanho de frame inválido: {length}")
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return body
+
+
+def decode_body(body: bytes) -> Tuple[int, int, int, float, bytes]:
+    """(tipo, nó, seq, enviado_em, payload)"""
+    version, msg_type, node_id, seq, sent_at = BODY_HEADER.unpack_from(body, 0)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Versão de protocolo não suportada: {version}")
+    return msg_type, node_id, seq, sent_at, body[BODY_HEADER.size:]
+
+
+def iter_symbols(payload: bytes) -> Iterator[Tuple[int, str, str]]:
+    """(id, fonte, par) de um payload SYMBOLS; ProtocolError se algum campo estiver truncado"""
+    end = len(payload)
+    offset = 0
+    while offset < end:
+        if offset + SYMBOL_ID.size > end:
+            raise ProtocolError("Payload SYMBOLS truncado")
+        symbol_id, src_len = SYMBOL_ID.unpack_from(payload, offset)
+        offset += SYMBOL_ID.size
+        # Fonte + byte de tamanho do par
+        if offset + src_len + 1 > end:
+            raise ProtocolError("Payload SYMBOLS truncado")
+        source = payload[offset:offset + src_len].decode('utf-8')
+        offset += src_len
+        name_len = payload[offset]
+        offset += 1
+        if offset + name_len > end:
+            raise ProtocolError("Payload SYMBOLS truncado")
+        pair = payload[offset:offset + name_len].decode('utf-8')
+        offset += name_len
+        yield symbol_id, source, pair
+
+
+def iter_quotes(payload: bytes) -> Iterator[Tuple[int, float]]:
+    if len(payload) % QUOTE.size:
+        raise ProtocolError("Payload QUOTES truncado")
+    return QUOTE.iter_unpack(payload)
+
+
+# ----- Central -----
+
+class NodeState:
+    """Sequência esperada e contadores de um nó remoto"""
+
+    __slots__ = ('node_id', 'name', 'expected_seq', 'messages', 'quotes', 'gaps',
+                 'restarts', 'last_seen', 'latency')
+
+    def __init__(self, node_id: int):
+        self.node_id = node_id
+        self.name = str(node_id)
+        self.expected_seq = 0
+        self.messages = 0
+        self.quotes = 0
+        self.gaps = 0
+        self.restarts = 0
+        self.last_seen = 0.0
+        self.latency = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'messages': self.messages,
+            'quotes': self.quotes,
+            'gaps': self.gaps,
+            'restarts': self.restarts,
+            'last_seen': self.last_seen,
+            'latency_seconds': self.latency,
+        }
+
+
+class _QuoteServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class RemoteQuoteFetcher(CryptoDataFetcher):
+    """Fetcher do engine central: o cache é alimentado pelos nós via TCP
+
+    Entregue ao ArbitrageEngine no lugar do CryptoDataFetcher; fetch_all_rates
+    só mescla o que os nós enviaram (mesma regra de idade máxima e inversas).
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, max_quote_age: float = 60):
+        super().__init__(rate_limits={}, max_quote_age=max_quote_age)
+        # O cache de cotações usa o lock do CryptoDataFetcher; este protege os nós
+        self.nodes: Dict[int, NodeState] = {}
+        self._nodes_lock = threading.Lock()
+
+        fetcher = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                fetcher._serve_connection(self.rfile, self.client_address)
+
+        self.server = _QuoteServer((host, port), Handler)
+        self.address = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, name='quote-stream', daemon=True)
+        self._thread.start()
+        logger.info("📡 Recebendo cotações de nós em %s:%d", *self.address[:2])
+        if host not in ('127.0.0.1', 'localhost', '::1'):
+            logger.warning("⚠️  Central sem autenticação escutando em %s: restrinja o acesso (firewall/VPN)", host)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _serve_connection(self, stream, address):
+        symbols: Dict[int, Tuple[str, str]] = {}
+        node = None
+        try:
+            while True:
+                body = read_frame(stream)
+                if body is None:
+                    break
+                msg_type, node_id, seq, sent_at, payload = decode_body(body)
+                node = self._check_sequence(node_id, seq, msg_type, payload)
+                node.latency = max(0.0, time.time() - sent_at)
+
+                if msg_type == SYMBOLS:
+                    for symbol_id, source, pair in iter_symbols(payload):
+                        symbols[symbol_id] = (source, pair)
+                elif msg_type == QUOTES:
+                    by_source: Dict[str, Dict[str, float]] = {}
+                    unknown = 0
+                    for symbol_id, price in iter_quotes(payload):
+                        symbol = symbols.get(symbol_id)
+                        if symbol is None:
+                            unknown += 1
+                            continue
+                        by_source.setdefault(symbol[0], {})[symbol[1]] = price
+                    for source, prices in by_source.items():
+                        self._store_quotes(source, prices)
+                    node.quotes += sum(len(p) for p in by_source.values())
+                    if unknown:
+                        PROFILER.increment(f"nodes.{node.name}.unknown_symbols", unknown)
+        except (ProtocolError, struct.error, UnicodeDecodeError) as e:
+            logger.warning("⚠️  Conexão de %s encerrada: %s", address[0], e)
+        except OSError:
+            pass
+        if node is not None:
+            logger.info("🔌 Nó %s desconectado", node.name)
+
+    def _check_sequence(self, node_id: int, seq: int, msg_type: int, payload: bytes) -> NodeState:
+        """Atualiza a sequência esperada do nó, contando lacunas e reinícios"""
+        with self._nodes_lock:
+            node = self.nodes.get(node_id)
+            if node is None:
+                node = self.nodes[node_id] = NodeState(node_id)
+            if msg_type == HELLO:
+                node.name = payload.decode('utf-8') or node.name
+
+            if node.expected_seq and seq > node.expected_seq:
+                missing = seq - node.expected_seq
+                node.gaps += missing
+                PROFILER.increment(f"nodes.{node.name}.gaps", missing)
+                logger.warning("⚠️  Nó %s: %d mensagens perdidas (seq %d, esperado %d)",
+                               node.name, missing, seq, node.expected_seq)
+            elif node.expected_seq and seq < node.expected_seq:
+                node.restarts += 1
+                logger.info("🔄 Nó %s reiniciado (seq %d)", node.name, seq)
+
+            node.expected_seq = seq + 1
+            node.messages += 1
+            node.last_seen = time.time()
+        PROFILER.set_gauge(f"nodes.{node.name}.lag_seconds", node.latency)
+        return node
+
+    def fetch_all_rates(self) -> RateSnapshot:
+        """Mescla as cotações recebidas dos nós (nenhuma requisição HTTP aqui)"""
+        with PROFILER.stage("fetch.normalize"):
+            with self._lock:
+                sources = sorted(self.cache)
+            all_prices = self._merge_cached_quotes(sources)
+            rates = self._build_snapshot(all_prices)
+        PROFILER.set_gauge("nodes.connected", len(self.nodes))
+        return rates
+
+    def node_stats(self) -> Dict[int, Dict]:
+        with self._nodes_lock:
+            return {node_id: node.to_dict() for node_id, node in self.nodes.items()}
+
+
+# ----- Nó -----
+
+class FetcherNode:
+    """Coleta um shard de fontes/pares e transmite as cotações ao central"""
+
+    def __init__(self, node_id: int, sources: Dict[str, Callable[[], Dict[str, float]]],
+                 address: Tuple[str, int] = ('127.0.0.1', DEFAULT_PORT),
+                 interval: float = 1.0, pairs: Optional[Iterable[str]] = None, name: Optional[str] = None):
+        self.node_id = node_id
+        self.name = name or f"node{node_id}"
+        self.sources = sources
+        self.address = address
+        self.interval = interval
+        self.pairs = set(pairs) if pairs else None
+        self.encoder = QuoteEncoder(node_id)
+        self.is_running = False
+        self._sock: Optional[socket.socket] = None
+
+    @classmethod
+    def for_exchanges(cls, node_id: int, exchanges: List[str], **kwargs) -> 'FetcherNode':
+        """Nó que coleta as exchanges indicadas com o CryptoDataFetcher real"""
+        fetcher = CryptoDataFetcher()
+        available = {
+            'CoinGecko': fetcher.fetch_coingecko_prices,
+            'Binance': fetcher.fetch_binance_prices,
+            'AwesomeAPI': fetcher.fetch_awesomeapi_rates,
+            'Coinbase': fetcher.fetch_coinbase_prices,
+        }
+        return cls(node_id, {name: available[name] for name in exchanges}, **kwargs)
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=10)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.encoder.reset_connection()
+        self._sock.sendall(self.encoder.hello(self.name))
+        logger.info("🔗 Nó %s conectado a %s:%d", self.name, *self.address)
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def collect_once(self):
+        """Uma rodada: coleta cada fonte do shard e envia as cotações"""
+        sent = False
+        for source, fetch in self.sources.items():
+            prices = fetch()
+            if self.pairs is not None:
+                prices = {pair: price for pair, price in prices.items() if pair in self.pairs}
+            if not prices:
+                continue
+            # Se o envio falhar, as mensagens já numeradas se perdem e o
+            # central vê a lacuna de seq no HELLO da reconexão
+            self._sock.sendall(self.encoder.quotes(source, prices))
+            sent = True
+
+        # Rodada sem cotações: heartbeat mantém a sequência e a latência visíveis
+        if not sent:
+            self._sock.sendall(self.encoder.heartbeat())
+
+    def run(self):
+        """Loop com reconexão e backoff exponencial"""
+        self.is_running = True
+        backoff = 1.0
+        while self.is_running:
+            try:
+                if self._sock is None:
+                    self._connect()
+                    backoff = 1.0
+                started = time.monotonic()
+                self.collect_once()
+                time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+            except OSError as e:
+                logger.warning("⚠️  Nó %s sem conexão (%s); nova tentativa em %.0fs",
+                               self.name, e, backoff)
+                self._close()
+                time.sleep(backoff)
+                backoff = min(MAX_RECONNECT_BACKOFF, backoff * 2)
+        self._close()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.is_running = False
+
+
+def main():
+    """central [[host:]porta] | node <id> <fontes> [host:porta]"""
+    from backend.structured_logging import setup_logging
+    setup_logging(verbose=False)
+
+    args = sys.argv[1:]
+    if not args or args[0] not in ('central', 'node'):
+        print(__doc__)
+        sys.exit(1)
+
+    if args[0] == 'central':
+        from backend.arbitrage_engine import ArbitrageEngine
+        host, _, port = (args[1] if len(args) > 1 else str(DEFAULT_PORT)).rpartition(':')
+        fetcher = RemoteQuoteFetcher(host=host or DEFAULT_HOST, port=int(port))
+        engine = ArbitrageEngine(output_dir="data", fetcher=fetcher)
+        engine.start_monitoring()
+    else:
+        node_id = int(args[1])
+        exchanges = args[2].split(',')
+        host, _, port = (args[3] if len(args) > 3 else f"127.0.0.1:{DEFAULT_PORT}").partition(':')
+        node = FetcherNode.for_exchanges(node_id, exchanges, address=(host, int(port)))
+        try:
+            node.run()
+        except KeyboardInterrupt:
+            node.stop()
+
+
+if __name__ == "__main__":
+    main()
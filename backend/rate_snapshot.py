@@ -0,0 +1,173 @@
+"""
+Snapshot compacto de taxas de câmbio
+
+Substitui a lista de tuplas (from, to, rate) por arrays paralelos: ids de
+moedas internados + array('i') de origem/destino + array('d') de taxas.
+O resumo de mercado é calculado uma única vez na construção.
+"""
+
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Moedas tratadas como fiat no resumo de mercado
+FIAT_CURRENCIES = frozenset(['USD', 'BRL', 'EUR', 'GBP', 'JPY', 'CAD'])
+
+# Moeda base posicionada sempre no índice 0
+BASE_CURRENCY = 'BRL'
+
+# Cabeçalho binário: tamanho do JSON de metadados, nº de arestas, nº de diretas
+_WIRE_HEADER = struct.Struct('<III')
+
+
+class RateSnapshot:
+    """Conjunto imutável de taxas armazenado em arrays paralelos"""
+
+    __slots__ = ('currencies', 'currency_idx', 'from_idx', 'to_idx', 'rates',
+                 'timestamp', 'crypto_currencies', 'fiat_currencies', 'direct_count')
+
+    def __init__(self, currencies: List[str], from_idx: array, to_idx: array,
+                 rates: array, timestamp: Optional[datetime] = None,
+                 direct_count: Optional[int] = None):
+        self.currencies = currencies
+        self.currency_idx = {curr: i for i, curr in enumerate(currencies)}
+        self.from_idx = from_idx
+        self.to_idx = to_idx
+        self.rates = rates
+        self.timestamp = timestamp or datetime.now()
+        # Arestas a partir de direct_count são sintéticas (taxas cruzadas)
+        self.direct_count = len(rates) if direct_count is None else direct_count
+
+        # Resumo pré-calculado (toda moeda aparece em pelo menos um par)
+        self.fiat_currencies = sorted(c for c in currencies if c in FIAT_CURRENCIES)
+        self.crypto_currencies = sorted(c for c in currencies if c not in FIAT_CURRENCIES)
+
+    @classmethod
+    def empty(cls) -> 'RateSnapshot':
+        return cls([], array('i'), array('i'), array('d'))
+
+    @classmethod
+    def from_tuples(cls, rates: Iterable[Tuple[str, str, float]]) -> 'RateSnapshot':
+        """Constrói snapshot a partir do formato legado (from, to, rate)"""
+        if isinstance(rates, RateSnapshot):
+            return rates
+        builder = RateSnapshotBuilder()
+        for from_curr, to_curr, rate in rates:
+            builder.add(from_curr, to_curr, rate)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, float]]:
+        """Itera no formato legado sem materializar uma lista"""
+        currencies = self.currencies
+        for i, j, rate in zip(self.from_idx, self.to_idx, self.rates):
+            yield currencies[i], currencies[j], rate
+
+    def to_bytes(self) -> bytes:
+        """Serialização compacta: cabeçalho + metadados JSON + arrays brutos"""
+        meta = json.dumps({
+            'currencies': self.currencies,
+            'timestamp': self.timestamp.isoformat()
+        }).encode('utf-8')
+        return b''.join((
+            _WIRE_HEADER.pack(len(meta), len(self.rates), self.direct_count),
+            meta,
+            self.from_idx.tobytes(),
+            self.to_idx.tobytes(),
+            self.rates.tobytes()
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'RateSnapshot':
+        """Inverso de to_bytes"""
+        meta_len, count, direct_count = _WIRE_HEADER.unpack_from(data, 0)
+        offset = _WIRE_HEADER.size
+        meta = json.loads(data[offset:offset + meta_len])
+        offset += meta_len
+
+        columns = []
+        for typecode in ('i', 'i', 'd'):
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+            columns.append(column)
+
+        currencies = [sys.intern(c) for c in meta['currencies']]
+        return cls(currencies, columns[0], columns[1], columns[2],
+                   timestamp=datetime.fromisoformat(meta['timestamp']),
+                   direct_count=direct_count)
+
+    def is_synthetic(self, position: int) -> bool:
+        """Indica se a aresta na posição foi derivada (não cotada diretamente)"""
+        return position >= self.direct_count
+
+    def summary(self) -> Dict:
+        """Resumo de mercado no mesmo formato de get_market_summary"""
+        return {
+            'timestamp': self.timestamp.isoformat(),
+            'total_currencies': len(self.currencies),
+            'total_crypto': len(self.crypto_currencies),
+            'total_fiat': len(self.fiat_currencies),
+            'total_pairs': len(self.rates),
+            'synthetic_pairs': len(self.rates) - self.direct_count,
+            'currencies': list(self.currencies),
+            'crypto_currencies': list(self.crypto_currencies),
+            'fiat_currencies': list(self.fiat_currencies)
+        }
+
+
+class RateSnapshotBuilder:
+    """Acumula taxas sem criar tuplas e deduplica pares por id inteiro"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._from = array('i')
+        self._to = array('i')
+        self._rates = array('d')
+        self._seen = set()
+
+    def _id(self, currency: str) -> int:
+        currency_id = self._ids.get(currency)
+        if currency_id is None:
+            currency_id = len(self._names)
+            currency = sys.intern(currency)
+            self._ids[currency] = currency_id
+            self._names.append(currency)
+        return currency_id
+
+    def add(self, from_curr: str, to_curr: str, rate: float) -> bool:
+        """Adiciona a taxa se o par ainda não existir; retorna se foi adicionada"""
+        i = self._id(from_curr)
+        j = self._id(to_curr)
+        key = (i << 32) | j
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self._from.append(i)
+        self._to.append(j)
+        self._rates.append(rate)
+        return True
+
+    @property
+    def pair_count(self) -> int:
+        return len(self._seen)
+
+    def build(self) -> RateSnapshot:
+        """Finaliza com moedas ordenadas e BRL no índice 0"""
+        ordered = sorted(self._names)
+        if BASE_CURRENCY in self._ids:
+            ordered.remove(BASE_CURRENCY)
+            ordered.insert(0, BASE_CURRENCY)
+
+        position = {name: i for i, name in enumerate(ordered)}
+        remap = [position[name] for name in self._names]
+        from_idx = array('i', [remap[i] for i in self._from])
+        to_idx = array('i', [remap[j] for j in self._to])
+        return RateSnapshot(ordered, from_idx, to_idx, self._rates)
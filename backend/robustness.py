@@ -0,0 +1,96 @@
+"""
+Robustez das oportunidades sob choques de taxa (cenários em lote com numpy)
+
+Cada oportunidade é reavaliada em milhares de cenários de uma só vez: uma
+matriz cenários × arestas de log-retornos ~ N(0, σ) por par, com σ vindo da
+volatilidade recente medida pelo FetchScheduler. As duas direções de um par
+recebem o mesmo choque com sinal oposto. Com a matriz de incidência ciclos ×
+arestas, o log-lucro de todos os ciclos em todos os cenários sai de um único
+produto matricial.
+
+O ranqueamento usa um quantil baixo do lucro nos cenários (por padrão o 5º
+percentil), que penaliza ciclos voláteis; a média de expm1 faria o contrário,
+premiando a volatilidade. Os choques são antitéticos (z e -z) e sorteados com
+semente fixa a cada chamada, então o filtro é determinístico para as mesmas
+taxas e volatilidades.
+"""
+
+import math
+from typing import Dict, List
+
+import numpy as np
+
+from backend.log_space import threshold_log_profit
+
+# A volatilidade do scheduler é uma média de |log-retorno|; para a normal,
+# E|r| = σ·sqrt(2/π), então σ = média · sqrt(π/2)
+ABS_MEAN_TO_SIGMA = math.sqrt(math.pi / 2)
+
+# Campos anotados por RobustnessScorer.score (iguais em todas as rotações de um ciclo)
+SCORE_FIELDS = ('survival_probability', 'expected_profit_percent', 'risk_adjusted_profit_percent')
+
+
+class RobustnessScorer:
+    """Probabilidade de sobrevivência e lucro esperado de cada ciclo"""
+
+    def __init__(self, scenarios: int = 2000, default_volatility: float = 0.001,
+                 quantile: float = 0.05, seed: int = 0):
+        self.scenarios = scenarios
+        self.default_volatility = default_volatility
+        self.quantile = quantile
+        self.seed = seed
+
+    def _shocks(self, edges: int) -> np.ndarray:
+        """Cenários × arestas de N(0, 1) antitéticos, sempre os mesmos para a mesma forma"""
+        half = np.random.default_rng(self.seed).standard_normal(((self.scenarios + 1) // 2, edges))
+        return np.concatenate((half, -half))[:self.scenarios]
+
+    def score(self, opportunities: List[Dict], volatility: Dict[str, float],
+              min_profit_percent: float = 0.0) -> List[Dict]:
+        """Anota 'survival_probability', 'expected_profit_percent' e
+        'risk_adjusted_profit_percent' (lucro no quantil baixo dos cenários)
+
+        volatility: {par 'A/B': média de |log-retorno|}; pares sem medição
+        (ex.: taxas cruzadas) usam a mediana das medidas ou default_volatility.
+        """
+        if not opportunities or not self.scenarios:
+            return opportunities
+
+        # Arestas (pares não direcionados) usadas pelos ciclos, com sinal por perna
+        edge_idx: Dict[str, int] = {}
+        legs = []
+        for k, opp in enumerate(opportunities):
+            path = opp['path']
+            for a, b in zip(path, path[1:]):
+                # Orientação do par medido; sem medição, ordem alfabética
+                if f"{a}/{b}" in volatility:
+                    pair, sign = f"{a}/{b}", 1.0
+                elif f"{b}/{a}" in volatility or b < a:
+                    pair, sign = f"{b}/{a}", -1.0
+                else:
+                    pair, sign = f"{a}/{b}", 1.0
+                legs.append((k, edge_idx.setdefault(pair, len(edge_idx)), sign))
+
+        measured = [v for v in volatility.values() if v > 0]
+        fallback = float(np.median(measured)) if measured else self.default_volatility
+        sigma = np.array([volatility.get(pair) or fallback for pair in edge_idx]) * ABS_MEAN_TO_SIGMA
+
+        # Incidência ciclos × arestas (soma dos sinais de cada perna)
+        incidence = np.zeros((len(opportunities), len(edge_idx)))
+        for k, e, sign in legs:
+            incidence[k, e] += sign
+
+        # Cenários × arestas de choques em log; log-lucro por cenário × ciclo
+        shocks = self._shocks(len(edge_idx)) * sigma
+        base = np.array([opp['log_profit'] for opp in opportunities])
+        profits = base + shocks @ incidence.T
+
+        survival = (profits > threshold_log_profit(min_profit_percent)).mean(axis=0)
+        expected = np.expm1(profits).mean(axis=0) * 100
+        risk_adjusted = np.expm1(np.quantile(profits, self.quantile, axis=0)) * 100
+
+        for opp, p, e, r in zip(opportunities, survival, expected, risk_adjusted):
+            opp['survival_probability'] = float(p)
+            opp['expected_profit_percent'] = float(e)
+            opp['risk_adjusted_profit_percent'] = float(r)
+        return opportunities
@@ -0,0 +1,78 @@
+"""
+Snapshot compartilhado entre processos via arquivo mmap com sequence lock
+
+Um único escritor publica o payload mais recente; leitores em outros processos
+copiam sem bloquear o escritor. Cabeçalho: [seq uint64][tamanho uint32].
+O escritor torna seq ímpar, grava o payload e torna seq par de novo; o leitor
+repete a leitura se encontrar seq ímpar ou se seq mudou durante a cópia.
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Optional, Tuple
+
+HEADER = struct.Struct('<QI')
+
+# Capacidade padrão do payload (bytes)
+DEFAULT_CAPACITY = 4 * 1024 * 1024
+
+# Tentativas de leitura antes de desistir (escritor muito ativo)
+MAX_READ_RETRIES = 1000
+
+
+class SharedSnapshot:
+    """Buffer de último-valor mapeado em memória, seguro para 1 escritor e N leitores"""
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        size = HEADER.size + capacity
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'a+b') as f:
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def sequence(self) -> int:
+        """Número de sequência atual (par = estável, 0 = nunca escrito)"""
+        return HEADER.unpack_from(self._mm, 0)[0]
+
+    def write(self, payload: bytes):
+        """Publica um novo payload (apenas um processo escritor por arquivo)"""
+        if len(payload) > self.capacity:
+            raise ValueError(f"Payload de {len(payload)} bytes excede a capacidade de {self.capacity}")
+
+        seq = self.sequence()
+        # Escritor anterior morreu no meio de uma escrita: descartar o payload parcial
+        if seq & 1:
+            seq += 1
+
+        HEADER.pack_into(self._mm, 0, seq + 1, len(payload))
+        self._mm[HEADER.size:HEADER.size + len(payload)] = payload
+        HEADER.pack_into(self._mm, 0, seq + 2, len(payload))
+
+    def read(self) -> Tuple[int, Optional[bytes]]:
+        """Retorna (seq, payload) consistentes; payload None se nunca escrito"""
+        for _ in range(MAX_READ_RETRIES):
+            seq, length = HEADER.unpack_from(self._mm, 0)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            if seq == 0:
+                return 0, None
+            payload = self._mm[HEADER.size:HEADER.size + min(length, self.capacity)]
+            if HEADER.unpack_from(self._mm, 0)[0] == seq:
+                return seq, payload
+        raise TimeoutError(f"Não foi possível obter leitura consistente de {self.path}")
+
+    def reset(self):
+        """Volta ao estado 'nunca escrito' (só com nenhum escritor ativo)"""
+        HEADER.pack_into(self._mm, 0, 0, 0)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,91 @@
+"""
+Scanner de spreads entre exchanges para o mesmo par
+
+A mescla de fontes em fetch_all_rates mantém só uma cotação por par; aqui as
+cotações de todas as fontes são agrupadas por par (A/B e B/A juntos) e o
+melhor spread — comprar na fonte mais barata, vender na mais cara — é
+calculado para todos os pares de uma vez com numpy. As fontes fornecem um
+único preço por par, usado como compra e venda.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# {fonte: {par 'A/B': (preço, timestamp)}} — mesmo formato do cache do fetcher
+VenueQuotes = Dict[str, Dict[str, Tuple[float, float]]]
+
+
+class SpreadScanner:
+    """Ranqueia spreads entre fontes para pares cotados em mais de uma fonte"""
+
+    def __init__(self, min_spread_percent: float = 0.0, max_quote_age: float = 60):
+        self.min_spread_percent = min_spread_percent
+        self.max_quote_age = max_quote_age
+
+    def scan(self, quotes: VenueQuotes, now: Optional[float] = None) -> List[Dict]:
+        """Spreads acima do mínimo, do maior para o menor"""
+        if now is None:
+            now = time.time()
+
+        venues = sorted(quotes)
+        pair_ids: Dict[str, int] = {}
+        pair_col, venue_col, price_col = [], [], []
+        for v, venue in enumerate(venues):
+            for pair, (price, timestamp) in quotes[venue].items():
+                if price <= 0 or '/' not in pair or now - timestamp > self.max_quote_age:
+                    continue
+                # Mesma orientação para todas as fontes: a do primeiro par visto
+                # (BRL/BTC de uma fonte vira 1 / preço em BTC/BRL)
+                base, quote = pair.split('/', 1)
+                inverse = f"{quote}/{base}"
+                if inverse in pair_ids:
+                    pair, price = inverse, 1.0 / price
+                pair_col.append(pair_ids.setdefault(pair, len(pair_ids)))
+                venue_col.append(v)
+                price_col.append(price)
+
+        if not price_col:
+            return []
+
+        pair_arr = np.asarray(pair_col, dtype=np.int64)
+        venue_arr = np.asarray(venue_col, dtype=np.int64)
+        price_arr = np.asarray(price_col, dtype=np.float64)
+
+        # Ordenar por par e, dentro do par, por preço: primeiro = compra, último = venda
+        order = np.lexsort((price_arr, pair_arr))
+        pair_arr, venue_arr, price_arr = pair_arr[order], venue_arr[order], price_arr[order]
+
+        starts = np.flatnonzero(np.r_[True, pair_arr[1:] != pair_arr[:-1]])
+        ends = np.r_[starts[1:], len(pair_arr)] - 1
+        counts = ends - starts + 1
+
+        multi = counts > 1
+        starts, ends, counts = starts[multi], ends[multi], counts[multi]
+        if not len(starts):
+            return []
+
+        buy_price = price_arr[starts]
+        sell_price = price_arr[ends]
+        spread = np.expm1(np.log(sell_price) - np.log(buy_price)) * 100
+
+        keep = spread > self.min_spread_percent
+        ranked = np.argsort(-spread[keep], kind='stable')
+
+        names = {i: key for key, i in pair_ids.items()}
+        starts, ends, counts = starts[keep][ranked], ends[keep][ranked], counts[keep][ranked]
+        spread = spread[keep][ranked]
+
+        return [
+            {
+                'pair': names[int(pair_arr[s])],
+                'buy_venue': venues[int(venue_arr[s])],
+                'buy_price': float(price_arr[s]),
+                'sell_venue': venues[int(venue_arr[e])],
+                'sell_price': float(price_arr[e]),
+                'spread_percent': float(pct),
+                'venues': int(c)
+            }
+            for s, e, c, pct in zip(starts, ends, counts, spread)
+        ]
@@ -0,0 +1,117 @@
+"""
+Arquivos estáticos do frontend servidos da memória, pré-comprimidos
+
+Na inicialização cada arquivo de frontend/ é lido uma vez e recebe variantes
+gzip (e brotli, se o módulo estiver instalado) e um ETag pelo hash do conteúdo.
+O index.html é reescrito para referenciar app.js?v=<hash> e styles.css?v=<hash>:
+com a versão na URL o asset é imutável e pode ficar em cache por um ano; o
+próprio index.html é revalidado (ETag) a cada carregamento.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; gzip sempre disponível
+    brotli = None
+
+# Cache de assets versionados (URL com ?v=<hash> correto)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Cache de assets sem versão na URL: sempre revalidar via ETag
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Arquivos menores que isso não compensam compressão
+MIN_COMPRESS_SIZE = 256
+
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class StaticAsset:
+    """Conteúdo de um arquivo em memória com suas variantes comprimidas"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'version', 'variants')
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.version = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.variants: Dict[str, bytes] = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE and content_type.startswith(TEXT_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+
+    def negotiate(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Melhor variante aceita pelo cliente: (corpo, Content-Encoding ou None)"""
+        accepted = {token.split(';')[0].strip() for token in accept_encoding.lower().split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                return self.variants[encoding], encoding
+        return self.body, None
+
+
+class StaticAssets:
+    """Assets de um diretório, indexados pela URL (/frontend/app.js)"""
+
+    def __init__(self, directory: str, url_prefix: str = '/frontend'):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.assets: Dict[str, StaticAsset] = {}
+        self.load()
+
+    def load(self):
+        """(Re)carrega todos os arquivos do diretório para a memória"""
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                if content_type.startswith('text/'):
+                    content_type += '; charset=utf-8'
+                with open(path, 'rb') as f:
+                    assets[f"{self.url_prefix}/{rel}"] = f.read(), content_type
+
+        # Versionar as referências locais nos HTML antes de calcular seus hashes
+        versions = {
+            url: StaticAsset(body, content_type).version
+            for url, (body, content_type) in assets.items()
+            if not url.endswith('.html')
+        }
+        self.assets = {}
+        for url, (body, content_type) in assets.items():
+            if url.endswith('.html'):
+                body = self._version_references(url, body, versions)
+            self.assets[url] = StaticAsset(body, content_type)
+
+    def _version_references(self, url: str, body: bytes, versions: Dict[str, str]) -> bytes:
+        base = url.rsplit('/', 1)[0]
+
+        def replace(match):
+            target = f"{base}/{match.group(2).decode()}"
+            if target not in versions:
+                return match.group(0)
+            return match.group(1) + match.group(2) + b'?v=' + versions[target].encode() + match.group(3)
+
+        return re.sub(rb'((?:src|href)=")([^":?#]+)(")', replace, body)
+
+    def get(self, url: str) -> Optional[StaticAsset]:
+        return self.assets.get(url)
+
+    def cache_control(self, asset: StaticAsset, query_version: Optional[str]) -> str:
+        """Imutável quando a URL traz a versão atual; caso contrário revalidar"""
+        if query_version == asset.version:
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
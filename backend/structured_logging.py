@@ -0,0 +1,99 @@
+"""
+Logging estruturado, com níveis e assíncrono
+
+Os módulos registram via logging padrão; um QueueHandler entrega os registros
+a uma thread de escrita (QueueListener), então o I/O de stdout sai da thread de
+detecção. Mensagens usam formatação preguiçosa (`logger.info("%s", x)`) e
+trechos caros ficam atrás de `logger.isEnabledFor(...)`.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+ROOT_LOGGER = 'arbitrage'
+
+# Atributos padrão de LogRecord (o resto vem de `extra=` e vai para o JSON)
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue: Optional[queue.Queue] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, incluindo campos passados em `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enfileira o registro sem formatá-lo: a formatação ocorre na thread de escrita"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger filho de 'arbitrage' (ex.: get_logger('engine'))"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging(verbose: bool = True, json_output: bool = False,
+                  level: Optional[str] = None, stream=None) -> logging.Logger:
+    """Configura o logger 'arbitrage' com escrita assíncrona (idempotente)
+
+    verbose=True habilita DEBUG (detalhes por fonte e por oportunidade);
+    `level` explícito tem precedência.
+    """
+    global _listener, _queue
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper() if level else (logging.DEBUG if verbose else logging.INFO))
+
+    if _listener is not None:
+        return root
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if json_output:
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(message)s'))
+
+    _queue = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(_queue, output, respect_handler_level=True)
+    _listener.start()
+
+    root.handlers[:] = [DeferredQueueHandler(_queue)]
+    root.propagate = False
+    atexit.register(shutdown_logging)
+    return root
+
+
+def queue_depth() -> int:
+    """Registros ainda não escritos (exposto como métrica)"""
+    return _queue.qsize() if _queue is not None else 0
+
+
+def shutdown_logging():
+    """Esvazia a fila e para a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,298 @@
+"""
+Modo supervisor: coleta, detecção e servidor web em processos separados
+
+Cada papel roda em seu próprio processo (sem disputar o GIL). A coleta publica
+o RateSnapshot mais recente em data/rates.shm e, em data/feed.shm, o que só ela
+mede (volatilidade, prioridade das arestas, taxas de atualização e cotações por
+fonte). A detecção não coleta nada: um SharedFeedDataManager entrega esses
+dados à engine, que publica o último resultado em data/results.shm e a lista
+completa de oportunidades (para /api/opportunities) em data/opportunities.shm.
+Tudo via SharedSnapshot (mmap + sequence lock).
+O supervisor reinicia processos que morrerem, com backoff exponencial.
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.event_bus import EventBus, COALESCE
+from backend.rate_snapshot import RateSnapshot
+from backend.shared_snapshot import SharedSnapshot
+from backend.structured_logging import get_logger, setup_logging
+
+logger = get_logger('supervisor')
+
+RATES_FILE = "rates.shm"
+FEED_FILE = "feed.shm"
+RESULTS_FILE = "results.shm"
+OPPORTUNITIES_FILE = "opportunities.shm"
+
+RATES_CAPACITY = 1024 * 1024
+FEED_CAPACITY = 4 * 1024 * 1024
+RESULTS_CAPACITY = 4 * 1024 * 1024
+OPPORTUNITIES_CAPACITY = 32 * 1024 * 1024
+
+# Intervalo de verificação de novos snapshots pela detecção (segundos)
+DETECTOR_POLL_INTERVAL = 0.05
+
+# Backoff máximo entre reinícios de um processo (segundos)
+MAX_RESTART_BACKOFF = 30.0
+
+
+def _setup_process_logging():
+    import config
+    setup_logging(verbose=config.VERBOSE_LOGGING,
+                  json_output=config.LOG_FORMAT == 'json',
+                  level=config.LOG_LEVEL)
+
+
+def encode_feed(manager) -> bytes:
+    """Métricas da coleta que a detecção não tem como medir sozinha"""
+    return json.dumps({
+        'volatility': manager.get_volatility(),
+        'edge_priority': [[a, b, p] for (a, b), p in manager.get_edge_priority().items()],
+        'refresh_rates': manager.get_refresh_rates(),
+        'venue_quotes': manager.get_venue_quotes(),
+    }).encode('utf-8')
+
+
+def encode_opportunities(opportunities: List[Dict], capacity: int = OPPORTUNITIES_CAPACITY) -> bytes:
+    """Lista completa (em ordem de lucro) com o total; cortada pela metade até caber"""
+    count = len(opportunities)
+    while True:
+        payload = json.dumps({'total': len(opportunities),
+                              'opportunities': opportunities[:count]}).encode('utf-8')
+        if len(payload) <= capacity or count == 0:
+            return payload
+        count //= 2
+
+
+class SharedFeedDataManager:
+    """Substituto do RealTimeDataManager no processo de detecção
+
+    Mesma interface usada pela ArbitrageEngine, mas sem fetcher: o snapshot e
+    as métricas da coleta chegam do processo de coleta via publish().
+    """
+
+    def __init__(self):
+        self.current_rates = RateSnapshot.empty()
+        self.market_summary = {}
+        self.last_update = None
+        self.volatility: Dict[str, float] = {}
+        self.edge_priority: Dict[Tuple[str, str], float] = {}
+        self.refresh_rates: Dict[str, float] = {}
+        self.venue_quotes: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self.bus = EventBus()
+
+    def add_callback(self, callback, policy: str = COALESCE, maxsize: int = 16,
+                     name: Optional[str] = None):
+        return self.bus.subscribe('rates', callback, name=name, maxsize=maxsize, policy=policy)
+
+    def wait_for_consumers(self, timeout: Optional[float] = None) -> bool:
+        return self.bus.drain(timeout)
+
+    def publish(self, rates: RateSnapshot, feed: Optional[Dict] = None):
+        """Novo snapshot da coleta (e métricas, se houver) entregue aos callbacks"""
+        if feed:
+            self.volatility = feed['volatility']
+            self.edge_priority = {(a, b): p for a, b, p in feed['edge_priority']}
+            self.refresh_rates = feed['refresh_rates']
+            self.venue_quotes = {
+                source: {pair: tuple(quote) for pair, quote in quotes.items()}
+                for source, quotes in feed['venue_quotes'].items()
+            }
+        self.current_rates = rates
+        self.market_summary = rates.summary()
+        self.last_update = rates.timestamp
+        self.republish()
+
+    def restore(self, rates: RateSnapshot, quotes: Dict[str, Dict[str, Tuple[float, float]]]):
+        self.venue_quotes = quotes
+        self.current_rates = rates
+        self.market_summary = rates.summary()
+        self.last_update = rates.timestamp
+
+    def republish(self):
+        self.bus.publish('rates', self.current_rates, self.market_summary)
+
+    # Coleta acontece em outro processo
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def update_data(self):
+        pass
+
+    def get_current_data(self) -> Tuple[RateSnapshot, Dict]:
+        return self.current_rates, self.market_summary
+
+    def get_refresh_rates(self) -> Dict[str, float]:
+        return self.refresh_rates
+
+    def get_venue_quotes(self) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        return self.venue_quotes
+
+    def get_volatility(self) -> Dict[str, float]:
+        return self.volatility
+
+    def get_edge_priority(self) -> Dict[Tuple[str, str], float]:
+        return self.edge_priority
+
+
+def fetcher_main(data_dir: str):
+    """Processo de coleta: publica cada RateSnapshot em rates.shm e as métricas em feed.shm"""
+    import config
+    from backend.crypto_data_fetcher import RealTimeDataManager
+
+    _setup_process_logging()
+    rates_out = SharedSnapshot(os.path.join(data_dir, RATES_FILE), RATES_CAPACITY)
+    feed_out = SharedSnapshot(os.path.join(data_dir, FEED_FILE), FEED_CAPACITY)
+
+    manager = RealTimeDataManager(update_interval=1, rate_limits=config.FETCH_RATE_LIMITS)
+
+    def publish(rates, summary):
+        # Métricas antes das taxas: a detecção acorda com a sequência de rates.shm
+        feed_out.write(encode_feed(manager))
+        rates_out.write(rates.to_bytes())
+
+    manager.add_callback(publish, name='rates_shm')
+    manager.start()
+    while True:
+        time.sleep(1)
+
+
+def detector_main(data_dir: str):
+    """Processo de detecção: consome rates.shm + feed.shm e publica results.shm + opportunities.shm"""
+    from backend.arbitrage_engine import ArbitrageEngine
+
+    _setup_process_logging()
+    rates_in = SharedSnapshot(os.path.join(data_dir, RATES_FILE), RATES_CAPACITY)
+    feed_in = SharedSnapshot(os.path.join(data_dir, FEED_FILE), FEED_CAPACITY)
+    results_out = SharedSnapshot(os.path.join(data_dir, RESULTS_FILE), RESULTS_CAPACITY)
+    opportunities_out = SharedSnapshot(os.path.join(data_dir, OPPORTUNITIES_FILE), OPPORTUNITIES_CAPACITY)
+
+    manager = SharedFeedDataManager()
+    engine = ArbitrageEngine(output_dir=data_dir, data_manager=manager)
+
+    def publish(results):
+        # results traz só o top; o índice do tick (já montado) vai inteiro para a API
+        results_out.write(json.dumps(results).encode('utf-8'))
+        opportunities_out.write(encode_opportunities(engine.opportunity_index.items))
+
+    engine.add_result_sink(publish)
+    engine.is_running = True
+    if engine.restored:
+        # Primeira análise sobre o checkpoint enquanto a coleta não publica
+        manager.republish()
+
+    last_seq = 0
+    while True:
+        if rates_in.sequence() == last_seq:
+            time.sleep(DETECTOR_POLL_INTERVAL)
+            continue
+        seq, payload = rates_in.read()
+        if payload is None or seq == last_seq:
+            continue
+        last_seq = seq
+        _, feed = feed_in.read()
+        manager.publish(RateSnapshot.from_bytes(payload), json.loads(feed) if feed else None)
+
+
+def web_main(data_dir: str):
+    """Processo do servidor web: resultados lidos direto de results.shm e opportunities.shm"""
+    from server import start_server
+
+    _setup_process_logging()
+    data_dir = os.path.abspath(data_dir)
+    results_in = SharedSnapshot(os.path.join(data_dir, RESULTS_FILE), RESULTS_CAPACITY)
+    opportunities_in = SharedSnapshot(os.path.join(data_dir, OPPORTUNITIES_FILE), OPPORTUNITIES_CAPACITY)
+    start_server(results_snapshot=results_in, opportunities_snapshot=opportunities_in)
+
+
+class Supervisor:
+    """Inicia processos nomeados e os reinicia quando terminam"""
+
+    def __init__(self, specs: Dict[str, Tuple[Callable, tuple]]):
+        self.specs = specs
+        self.context = multiprocessing.get_context('spawn')
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.restarts: Dict[str, int] = {name: 0 for name in specs}
+        self.next_start: Dict[str, float] = {name: 0.0 for name in specs}
+        self.is_running = False
+
+    def _spawn(self, name: str):
+        target, args = self.specs[name]
+        process = self.context.Process(target=target, args=args, name=name, daemon=True)
+        process.start()
+        self.processes[name] = process
+        logger.info("🚀 Processo %s iniciado (pid %s)", name, process.pid)
+
+    def start(self):
+        self.is_running = True
+        for name in self.specs:
+            self._spawn(name)
+
+    def check(self):
+        """Reinicia processos que terminaram, respeitando o backoff"""
+        now = time.monotonic()
+        for name, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            if self.next_start[name] == 0.0:
+                self.restarts[name] += 1
+                backoff = min(MAX_RESTART_BACKOFF, 2 ** (self.restarts[name] - 1))
+                self.next_start[name] = now + backoff
+                logger.warning("⚠️  Processo %s terminou (código %s); reiniciando em %.0fs",
+                               name, process.exitcode, backoff)
+            if now >= self.next_start[name]:
+                self.next_start[name] = 0.0
+                self._spawn(name)
+
+    def run_forever(self, poll_interval: float = 1.0):
+        self.start()
+        try:
+            while self.is_running:
+                self.check()
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            logger.info("🛑 Encerrando processos...")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.is_running = False
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=5)
+
+
+def run_supervised(data_dir: str = "data"):
+    """Executa coleta, detecção e web como processos supervisionados"""
+    _setup_process_logging()
+    data_dir = os.path.abspath(data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # Criar os arquivos compartilhados antes de qualquer processo abri-los,
+    # descartando o que uma execução anterior tenha deixado neles
+    for name, capacity in ((RATES_FILE, RATES_CAPACITY), (FEED_FILE, FEED_CAPACITY),
+                           (RESULTS_FILE, RESULTS_CAPACITY),
+                           (OPPORTUNITIES_FILE, OPPORTUNITIES_CAPACITY)):
+        snapshot = SharedSnapshot(os.path.join(data_dir, name), capacity)
+        snapshot.reset()
+        snapshot.close()
+
+    supervisor = Supervisor({
+        'fetcher': (fetcher_main, (data_dir,)),
+        'detector': (detector_main, (data_dir,)),
+        'web': (web_main, (data_dir,)),
+    })
+    supervisor.run_forever()
@@ -61,6 +61,38 @@ HTTP_TIMEOUT = 10
 # Timeout reduzido para Coinbase (endpoint individual)
 COINBASE_TIMEOUT = 5
 
+# ===== CONFIGURAÇÕES DE RATE LIMIT =====
+
+# Token bucket por fonte: (requisições por minuto, burst máximo)
+# Cada requisição HTTP consome um token; Binance e Coinbase fazem uma
+# requisição por par, CoinGecko e AwesomeAPI uma por coleta
+FETCH_RATE_LIMITS = {
+    'CoinGecko': (10, 2),
+    'Binance': (300, 20),
+    'AwesomeAPI': (30, 1),
+    'Coinbase': (120, 6),
+}
+
+# ===== CONFIGURAÇÕES DO BARRAMENTO DE EVENTOS =====
+
+# O que fazer quando a análise não acompanha as coletas:
+# 'coalesce' (analisa só o snapshot mais recente), 'drop_oldest' ou 'block'
+EVENT_OVERFLOW_POLICY = 'coalesce'
+
+# Tamanho máximo da fila de cada assinante (drop_oldest/block)
+EVENT_QUEUE_SIZE = 16
+
+# ===== CONFIGURAÇÕES DE CHECKPOINT (REINÍCIO A QUENTE) =====
+
+# Intervalo entre checkpoints do estado ao vivo (taxas, cotações por fonte,
+# oportunidades ativas) em segundos; None desativa
+CHECKPOINT_INTERVAL_SECONDS = 30
+
+# Checkpoints mais antigos que isso são ignorados na inicialização (segundos).
+# Não passar da idade máxima das cotações do fetcher (max_quote_age, 60s):
+# resultados sobre o checkpoint saem com status 'stale' até a primeira coleta
+CHECKPOINT_MAX_AGE_SECONDS = 60
+
 # ===== CONFIGURAÇÕES DO FRONTEND =====
 
 # Porta do servidor web
@@ -74,17 +106,60 @@ FRONTEND_UPDATE_INTERVAL = 5000
 # Usar Bellman-Ford otimizado por padrão
 USE_OPTIMIZED_BELLMAN_FORD = True
 
+# Algoritmo da detecção principal:
+# - 'bellman_ford': ciclos negativos que passam pela moeda base
+# - 'min_mean_cycle': ciclos de maior lucro por perna (iteração de Howard) que
+#   passam pela moeda base
+# Vale só para uma única moeda base sem prazo: a detecção com prazo
+# (DETECTION_BUDGET_SECONDS) e o modo carteira (várias bases) têm algoritmos
+# próprios e ignoram esta opção
+DETECTION_METHOD = 'bellman_ford'
+
 # Usar busca triangular para grafos pequenos (número máximo de moedas)
 MAX_CURRENCIES_FOR_TRIANGLE_SEARCH = 15
 
 # Frequência de busca triangular (a cada N ciclos)
 TRIANGLE_SEARCH_FREQUENCY = 10
 
+# Moedas base da carteira (início e fim de cada ciclo). Com mais de uma base,
+# todas são avaliadas numa única detecção e os resultados saem agrupados por base
+# Ex.: ['BRL', 'USD', 'USDT', 'EUR']
+BASE_CURRENCIES = ['BRL']
+
+# Prazo por verificação para a detecção (segundos). Com prazo, as arestas mais
+# voláteis/líquidas são examinadas primeiro e a detecção devolve o melhor que
+# encontrou quando o tempo acaba (resultado marcado como incompleto).
+# None = detecção completa, sem limite de tempo
+DETECTION_BUDGET_SECONDS = None
+
+# Procurar spreads do mesmo par entre exchanges a cada verificação
+SCAN_CROSS_EXCHANGE_SPREADS = True
+
+# Spread mínimo entre exchanges para reportar (em %)
+MIN_SPREAD_PERCENT = 0.1
+
+# Cenários de choque por verificação para medir a robustez de cada ciclo (0 desativa)
+ROBUSTNESS_SCENARIOS = 2000
+
+# Probabilidade mínima de o ciclo continuar acima do lucro mínimo sob os choques.
+# Como os choques são simétricos, todo ciclo acima do limiar já sobrevive em
+# ~50% dos cenários; 0.8 exige uma margem de ~0.84σ do ciclo acima do limiar
+MIN_SURVIVAL_PROBABILITY = 0.8
+
+# Quantil do lucro nos cenários usado para ranquear (0.05 = 5º percentil)
+ROBUSTNESS_QUANTILE = 0.05
+
 # ===== CONFIGURAÇÕES DE LOGGING =====
 
-# Mostrar logs detalhados
+# Mostrar logs detalhados (nível DEBUG: coletas por fonte e cada oportunidade)
 VERBOSE_LOGGING = True
 
+# Nível explícito ('DEBUG', 'INFO', 'WARNING'...); None usa VERBOSE_LOGGING
+LOG_LEVEL = None
+
+# Formato da saída: 'text' (legível) ou 'json' (uma linha por evento, para ingestão)
+LOG_FORMAT = 'text'
+
 # Mostrar estatísticas de performance a cada N verificações
 STATS_FREQUENCY = 5
 
@@ -131,9 +206,13 @@ EXCHANGERATE_API_URL = "https://api.exchangerate-api.com/v4/latest/USD"
 
 # ===== CONFIGURAÇÕES AVANÇADAS =====
 
-# Calcular taxas cruzadas automaticamente
+# Calcular taxas cruzadas automaticamente (pares ausentes das BASE_CURRENCIES
+# derivados via hubs); usadas para avaliação/exibição, não na detecção de ciclos
 CALCULATE_CROSS_RATES = True
 
+# Moedas hub para taxas cruzadas, em ordem de preferência (mais líquida primeiro)
+CROSS_RATE_HUBS = ['USD', 'USDT', 'BTC']
+
 # Incluir taxas inversas automaticamente
 INCLUDE_INVERSE_RATES = True
 
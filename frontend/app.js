@@ -176,7 +176,7 @@ class ArbitrageApp {
 
             // Atualizar UI
             this.updateUI();
-            this.updateStatus('online');
+            this.updateStatus(['warming_up', 'stale'].includes(this.currentData.status) ? 'warming' : 'online');
 
         } catch (error) {
             console.error('Erro ao carregar dados:', error);
@@ -432,6 +432,11 @@ class ArbitrageApp {
             this.statusBadge.style.borderColor = '#10b981';
             this.statusText.textContent = 'Online';
             this.statusText.style.color = '#10b981';
+        } else if (status === 'warming') {
+            this.statusBadge.style.background = 'rgba(245, 158, 11, 0.1)';
+            this.statusBadge.style.borderColor = '#f59e0b';
+            this.statusText.textContent = 'Aquecendo';
+            this.statusText.style.color = '#f59e0b';
         } else {
             this.statusBadge.style.background = 'rgba(239, 68, 68, 0.1)';
             this.statusBadge.style.borderColor = '#ef4444';
@@ -5,30 +5,28 @@ Launcher principal: Inicia backend (engine de arbitragem) e frontend (servidor w
 import sys
 import os
 import threading
-import time
 import webbrowser
 
 # Adicionar diretório ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.arbitrage_engine import ArbitrageEngine
 from server import start_server
 
-def run_backend():
+def run_backend(engine):
     """Roda o engine de arbitragem"""
     print("\n🔧 Iniciando Backend...")
-    engine = ArbitrageEngine(output_dir="data")
     engine.start_monitoring()
 
-def run_frontend():
-    """Roda o servidor web"""
-    time.sleep(2)  # Esperar um pouco antes de iniciar o servidor
+def run_frontend(server_ready, engine):
+    """Roda o servidor web (serve o snapshot 'warming_up' até a primeira análise)"""
     print("\n🌐 Iniciando Frontend...")
-    start_server()
+    start_server(ready_event=server_ready,
+                 status_provider=engine.status,
+                 opportunity_provider=lambda: engine.opportunity_index)
 
-def open_browser():
-    """Abre o navegador após iniciar os serviços"""
-    time.sleep(4)  # Esperar serviços iniciarem
+def open_browser(server_ready):
+    """Abre o navegador assim que o servidor estiver escutando"""
+    server_ready.wait()
     url = "http://localhost:8000/frontend/index.html"
     print(f"\n🚀 Abrindo navegador em: {url}")
     try:
@@ -53,20 +51,24 @@ def main():
     os.makedirs("data", exist_ok=True)
 
     try:
+        # Import tardio: o engine só é carregado depois das mensagens iniciais
+        from backend.arbitrage_engine import ArbitrageEngine
+
+        # Construção rápida: histórico carrega em background e um snapshot
+        # 'warming_up' já fica disponível para o frontend
+        engine = ArbitrageEngine(output_dir="data")
+        server_ready = threading.Event()
+
         # Iniciar backend em thread separada
-        backend_thread = threading.Thread(target=run_backend, daemon=True)
+        backend_thread = threading.Thread(target=run_backend, args=(engine,), daemon=True)
         backend_thread.start()
 
-        # Esperar um pouco para o backend fazer a primeira coleta
-        print("⏳ Aguardando primeira coleta de dados...")
-        time.sleep(10)
-
-        # Abrir navegador em thread separada
-        browser_thread = threading.Thread(target=open_browser, daemon=True)
+        # Abrir navegador quando o servidor sinalizar que está pronto
+        browser_thread = threading.Thread(target=open_browser, args=(server_ready,), daemon=True)
         browser_thread.start()
 
-        # Iniciar frontend (servidor web) na thread principal
-        run_frontend()
+        # Iniciar frontend (servidor web) na thread principal, sem esperar a primeira coleta
+        run_frontend(server_ready, engine)
 
     except KeyboardInterrupt:
         print("\n\n🛑 Encerrando sistema...")
@@ -84,4 +86,9 @@ if __name__ == "__main__":
         print("\n💡 Execute: pip install numpy requests")
         sys.exit(1)
 
-    main()
+    # --supervisor: coleta, detecção e servidor em processos separados
+    if '--supervisor' in sys.argv[1:]:
+        from backend.supervisor import run_supervised
+        run_supervised("data")
+    else:
+        main()
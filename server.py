@@ -10,17 +10,57 @@ from urllib.parse import urlparse, parse_qs
 import threading
 import time
 
+from backend.profiler import PROFILER
+from backend.metrics_exporter import render_prometheus, CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+from backend.history_store import HistoryStore
+from backend.static_assets import StaticAssets
+from backend.opportunity_index import OpportunityIndex, DEFAULT_PAGE_SIZE
+
 PORT = 8000
+METRICS_FILE = os.path.join("data", "metrics.json")
+RESULTS_FILE = os.path.join("data", "arbitrage_results.json")
+HISTORY_FILE = os.path.join("data", "history.bin")
+
+# Função opcional que informa o estado do engine no mesmo processo ('warming_up'/'stale'/'ready')
+STATUS_PROVIDER = None
+
+# Função opcional que retorna o OpportunityIndex atual do engine no mesmo processo
+OPPORTUNITY_PROVIDER = None
+
+# SharedSnapshot opcional com o último resultado publicado pelo processo de detecção
+RESULTS_SNAPSHOT = None
+
+# SharedSnapshot opcional com a lista completa de oportunidades da detecção
+OPPORTUNITIES_SNAPSHOT = None
+
+# Último índice montado de OPPORTUNITIES_SNAPSHOT: (seq, OpportunityIndex, truncado)
+_INDEX_CACHE = (None, None, False)
+
+# Arquivos do frontend carregados em memória (com gzip/brotli) em start_server
+STATIC_ASSETS = None
+
+# Último history.bin lido: (mtime, HistoryStore); relido só quando o arquivo muda
+_HISTORY_CACHE = (None, None)
+
+# Dados ao vivo (resultados, métricas, API) nunca vão para cache
+LIVE_CACHE_CONTROL = 'no-store, no-cache, must-revalidate'
+
+class _ReusableTCPServer(socketserver.TCPServer):
+    allow_reuse_address = True
+
 
 class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """Handler HTTP com suporte a CORS"""
 
+    # Política de cache da resposta atual (assets estáticos definem a sua)
+    cache_control = LIVE_CACHE_CONTROL
+
     def end_headers(self):
         # Adicionar headers CORS
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        self.send_header('Cache-Control', self.cache_control)
         super().end_headers()
 
     def do_OPTIONS(self):
@@ -36,10 +76,162 @@ class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         if path == '/':
             path = '/frontend/index.html'
 
+        # Assets do frontend: direto da memória, comprimidos e com ETag
+        self.cache_control = LIVE_CACHE_CONTROL
+        asset = STATIC_ASSETS.get(path) if STATIC_ASSETS is not None else None
+        if asset is not None:
+            return self._send_asset(asset, parse_qs(parsed_path.query).get('v', [None])[0])
+
+        if path == '/api/metrics':
+            return self._send_body(json.dumps(self._metrics_snapshot()).encode('utf-8'),
+                                   'application/json')
+
+        if path == '/data/arbitrage_results.json' and RESULTS_SNAPSHOT is not None:
+            seq, payload = RESULTS_SNAPSHOT.read()
+            if payload is not None:
+                return self._send_body(payload, 'application/json')
+
+        if path == '/api/status':
+            return self._send_body(json.dumps({'status': self._engine_status()}).encode('utf-8'),
+                                   'application/json')
+
+        if path == '/api/history':
+            # Tendências de longo prazo: ?tier=raw|minute|hour (padrão: minute)
+            tier = parse_qs(parsed_path.query).get('tier', ['minute'])[0]
+            if not os.path.exists(HISTORY_FILE) or tier not in ('raw', 'minute', 'hour'):
+                self.send_error(404)
+                return
+            series = self._history_store().series(tier)
+            return self._send_body(json.dumps(series).encode('utf-8'), 'application/json')
+
+        if path == '/api/opportunities':
+            # Ex.: ?currency=ETH&min_profit=0.3&max_legs=4&offset=0&limit=50
+            try:
+                filters = self._opportunity_filters(parse_qs(parsed_path.query))
+            except ValueError:
+                self.send_error(400)
+                return
+            index, truncated = self._opportunity_index()
+            page = index.query(**filters)
+            # Índice parcial (só o top dos resultados): filtros não viram o conjunto todo
+            page['truncated'] = truncated
+            return self._send_body(json.dumps(page).encode('utf-8'), 'application/json')
+
+        if path == '/metrics':
+            return self._send_body(render_prometheus(self._metrics_snapshot()).encode('utf-8'),
+                                   PROMETHEUS_CONTENT_TYPE)
+
         # Servir arquivos normalmente
         self.path = path
         return super().do_GET()
 
+    def _metrics_snapshot(self):
+        """Métricas de performance do pipeline (leitura sem locks)"""
+        snapshot = PROFILER.snapshot()
+
+        # Servidor rodando sem o engine no mesmo processo: usar último relatório salvo
+        if not snapshot['stages'] and os.path.exists(METRICS_FILE):
+            with open(METRICS_FILE, 'r') as f:
+                snapshot = json.load(f)
+        return snapshot
+
+    def _history_store(self):
+        """HistoryStore de history.bin, em cache até o arquivo ser regravado"""
+        global _HISTORY_CACHE
+        mtime = os.stat(HISTORY_FILE).st_mtime_ns
+        if _HISTORY_CACHE[0] != mtime:
+            _HISTORY_CACHE = (mtime, HistoryStore.load(HISTORY_FILE))
+        return _HISTORY_CACHE[1]
+
+    def _opportunity_filters(self, query):
+        """Filtros da query string de /api/opportunities (ValueError se inválidos)"""
+        def single(name, convert):
+            values = query.get(name)
+            return convert(values[0]) if values else None
+
+        currencies = [c.strip().upper() for v in query.get('currency', []) for c in v.split(',') if c.strip()]
+        return {
+            'currencies': currencies,
+            'min_profit': single('min_profit', float),
+            'max_profit': single('max_profit', float),
+            'min_legs': single('min_legs', int),
+            'max_legs': single('max_legs', int),
+            'offset': single('offset', int) or 0,
+            'limit': single('limit', int) or DEFAULT_PAGE_SIZE,
+        }
+
+    def _opportunity_index(self):
+        """(índice, truncado): do engine no mesmo processo, da lista completa
+        publicada pela detecção ou, sem nenhum dos dois, do top salvo nos resultados"""
+        global _INDEX_CACHE
+        if OPPORTUNITY_PROVIDER is not None:
+            return OPPORTUNITY_PROVIDER(), False
+
+        if OPPORTUNITIES_SNAPSHOT is not None:
+            seq, payload = OPPORTUNITIES_SNAPSHOT.read()
+            if payload is not None:
+                if _INDEX_CACHE[0] != seq:
+                    data = json.loads(payload)
+                    opportunities = data['opportunities']
+                    _INDEX_CACHE = (seq, OpportunityIndex(opportunities), len(opportunities) < data['total'])
+                return _INDEX_CACHE[1], _INDEX_CACHE[2]
+
+        payload = None
+        if RESULTS_SNAPSHOT is not None:
+            seq, payload = RESULTS_SNAPSHOT.read()
+        try:
+            if payload is None:
+                with open(RESULTS_FILE, 'rb') as f:
+                    payload = f.read()
+            results = json.loads(payload)
+        except (OSError, ValueError):
+            return OpportunityIndex(), False
+        opportunities = results.get('opportunities', [])
+        total = results.get('statistics', {}).get('total_found', len(opportunities))
+        return OpportunityIndex(opportunities), len(opportunities) < total
+
+    def _engine_status(self):
+        """Estado do engine: via STATUS_PROVIDER ou pelo último arquivo de resultados"""
+        if STATUS_PROVIDER is not None:
+            return STATUS_PROVIDER()
+        if RESULTS_SNAPSHOT is not None:
+            seq, payload = RESULTS_SNAPSHOT.read()
+            return json.loads(payload).get('status', 'ready') if payload else 'warming_up'
+        try:
+            with open(RESULTS_FILE, 'r') as f:
+                return json.load(f).get('status', 'ready')
+        except (OSError, ValueError):
+            return 'warming_up'
+
+    def _send_body(self, body: bytes, content_type: str):
+        """Envia resposta 200 com corpo já serializado"""
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_asset(self, asset, version):
+        """Envia um asset estático (304 se o ETag do cliente ainda vale)"""
+        self.cache_control = STATIC_ASSETS.cache_control(asset, version)
+
+        if asset.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', asset.etag)
+            self.end_headers()
+            return
+
+        body, encoding = asset.negotiate(self.headers.get('Accept-Encoding', ''))
+        self.send_response(200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', asset.etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
     def log_message(self, format, *args):
         """Log personalizado"""
         # Mostrar apenas requisições importantes
@@ -50,12 +242,32 @@ class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Silenciar outros logs (erros, etc.)
 
 
-def start_server():
-    """Inicia servidor web"""
+def start_server(ready_event: threading.Event = None, status_provider=None,
+                 results_snapshot=None, opportunity_provider=None, opportunities_snapshot=None):
+    """Inicia servidor web
+
+    ready_event é sinalizado assim que o socket está escutando;
+    status_provider (opcional) alimenta /api/status;
+    results_snapshot (opcional) serve os resultados direto da memória compartilhada;
+    opportunity_provider (opcional) retorna o OpportunityIndex de /api/opportunities;
+    opportunities_snapshot (opcional) traz a lista completa publicada por outro processo.
+    """
+    global STATUS_PROVIDER, RESULTS_SNAPSHOT, STATIC_ASSETS, OPPORTUNITY_PROVIDER, OPPORTUNITIES_SNAPSHOT
+    STATUS_PROVIDER = status_provider
+    OPPORTUNITY_PROVIDER = opportunity_provider
+    RESULTS_SNAPSHOT = results_snapshot
+    OPPORTUNITIES_SNAPSHOT = opportunities_snapshot
+
     # Mudar para diretório raiz do projeto
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-    with socketserver.TCPServer(("", PORT), CORSHTTPRequestHandler) as httpd:
+    # Frontend lido e comprimido uma única vez, antes de aceitar conexões
+    STATIC_ASSETS = StaticAssets('frontend')
+
+    with _ReusableTCPServer(("", PORT), CORSHTTPRequestHandler) as httpd:
+        if ready_event is not None:
+            ready_event.set()
+
         print("=" * 60)
         print("🌐 SERVIDOR WEB INICIADO")
         print("=" * 60)
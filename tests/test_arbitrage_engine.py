@@ -0,0 +1,53 @@
+"""
+Testes da engine de arbitragem (backend/arbitrage_engine.py)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+import config
+from backend.arbitrage_engine import ArbitrageEngine
+from backend.rate_snapshot import RateSnapshot
+from backend.supervisor import SharedFeedDataManager
+
+
+# USD → ETH → BRL → USD rende ~2%; o restante do mercado é consistente
+RATES = [
+    ('USD', 'ETH', 1 / 3000.0), ('ETH', 'USD', 3000.0 * 0.999),
+    ('ETH', 'BRL', 15300.0), ('BRL', 'ETH', 1 / 15300.0 * 0.999),
+    ('BRL', 'USD', 0.2), ('USD', 'BRL', 5.0 * 0.999),
+]
+
+
+def run_engine(tmp_path, monkeypatch, **options):
+    monkeypatch.setattr(config, 'CHECKPOINT_INTERVAL_SECONDS', None)
+    monkeypatch.setattr(config, 'CALCULATE_CROSS_RATES', False)
+    monkeypatch.setattr(config, 'STATS_FREQUENCY', 0)
+    for name, value in options.items():
+        monkeypatch.setattr(config, name, value)
+
+    engine = ArbitrageEngine(output_dir=str(tmp_path), data_manager=SharedFeedDataManager())
+    snapshot = RateSnapshot.from_tuples(RATES)
+    engine.process_arbitrage(snapshot, snapshot.summary())
+    with open(tmp_path / "arbitrage_results.json") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('budget', [None, 1.0])
+@pytest.mark.parametrize('scenarios', [0, 2000])
+def test_multi_base_keeps_shared_cycle_in_every_base(tmp_path, monkeypatch, scenarios, budget):
+    results = run_engine(tmp_path, monkeypatch, BASE_CURRENCIES=['BRL', 'USD'],
+                         ROBUSTNESS_SCENARIOS=scenarios, DETECTION_BUDGET_SECONDS=budget)
+
+    assert [opp['path'] for opp in results['by_base']['BRL']] == [['BRL', 'USD', 'ETH', 'BRL']]
+    assert [opp['path'] for opp in results['by_base']['USD']] == [['USD', 'ETH', 'BRL', 'USD']]
+    assert len(results['opportunities']) == 1
+    if scenarios:
+        brl, usd = results['by_base']['BRL'][0], results['by_base']['USD'][0]
+        assert brl['survival_probability'] == usd['survival_probability'] == 1.0
+        assert brl['risk_adjusted_profit_percent'] == usd['risk_adjusted_profit_percent']
@@ -0,0 +1,113 @@
+"""
+Testes do protocolo binário de cotações (backend/quote_stream.py)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import struct
+
+import pytest
+
+from backend.quote_stream import (
+    BODY_HEADER, HEARTBEAT, HELLO, QUOTES, SYMBOL_ID, SYMBOLS, ProtocolError,
+    QuoteEncoder, RemoteQuoteFetcher, decode_body, iter_quotes, iter_symbols, read_frame,
+)
+
+
+def split_frames(data: bytes):
+    """Corpos decodificados (tipo, nó, seq, enviado_em, payload) de uma sequência de frames"""
+    stream = io.BytesIO(data)
+    frames = []
+    while True:
+        body = read_frame(stream)
+        if body is None:
+            return frames
+        frames.append(decode_body(body))
+
+
+@pytest.fixture
+def central():
+    fetcher = RemoteQuoteFetcher(host='127.0.0.1', port=0)
+    yield fetcher
+    fetcher.close()
+
+
+def test_quotes_round_trip():
+    encoder = QuoteEncoder(node_id=7)
+    prices = {'BTC/BRL': 250000.5, 'ETH/BRL': 15000.25}
+    frames = split_frames(encoder.hello('n7') + encoder.quotes('Binance', prices) + encoder.heartbeat())
+
+    assert [f[0] for f in frames] == [HELLO, SYMBOLS, QUOTES, HEARTBEAT]
+    assert [f[1] for f in frames] == [7, 7, 7, 7]
+    assert [f[2] for f in frames] == [1, 2, 3, 4]
+    assert frames[0][4] == b'n7'
+
+    symbols = {symbol_id: (source, pair) for symbol_id, source, pair in iter_symbols(frames[1][4])}
+    decoded = {symbols[symbol_id][1]: price for symbol_id, price in iter_quotes(frames[2][4])}
+    assert set(s[0] for s in symbols.values()) == {'Binance'}
+    assert decoded == prices
+
+
+def test_symbols_announced_once_per_connection():
+    encoder = QuoteEncoder(node_id=1)
+    prices = {'BTC/BRL': 1.0}
+    assert [f[0] for f in split_frames(encoder.quotes('X', prices))] == [SYMBOLS, QUOTES]
+    assert [f[0] for f in split_frames(encoder.quotes('X', prices))] == [QUOTES]
+
+    encoder.reset_connection()
+    assert [f[0] for f in split_frames(encoder.quotes('X', prices))] == [SYMBOLS, QUOTES]
+
+
+def test_truncated_symbols_raise_protocol_error():
+    payload = SYMBOL_ID.pack(3, 7) + b'Binance' + struct.pack('<B', 7) + b'BTC/BRL'
+    assert list(iter_symbols(payload)) == [(3, 'Binance', 'BTC/BRL')]
+
+    for cut in range(1, len(payload)):
+        with pytest.raises(ProtocolError):
+            list(iter_symbols(payload[:cut]))
+
+
+def test_truncated_quotes_raise_protocol_error():
+    with pytest.raises(ProtocolError):
+        list(iter_quotes(b'\x00' * 5))
+
+
+def test_invalid_frame_length_raises_protocol_error():
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(struct.pack('<I', BODY_HEADER.size - 1)))
+
+
+def test_central_listens_on_loopback_by_default(central):
+    assert central.address[0] == '127.0.0.1'
+
+
+def test_central_counts_gaps_and_restarts(central):
+    encoder = QuoteEncoder(node_id=2)
+    hello = encoder.hello('n2')
+    first = encoder.quotes('X', {'BTC/BRL': 1.0})
+    encoder.quotes('X', {'BTC/BRL': 2.0})  # perdida
+    encoder.reset_connection()
+    last = encoder.quotes('X', {'BTC/BRL': 3.0})
+
+    central._serve_connection(io.BytesIO(hello + first + last), ('127.0.0.1', 0))
+    stats = central.node_stats()[2]
+    assert stats['name'] == 'n2'
+    assert stats['gaps'] == 1
+    assert stats['restarts'] == 0
+    assert central.venue_quotes()['X']['BTC/BRL'][0] == 3.0
+
+    # Nó reiniciado: seq volta a 1
+    restarted = QuoteEncoder(node_id=2)
+    central._serve_connection(io.BytesIO(restarted.hello('n2')), ('127.0.0.1', 0))
+    assert central.node_stats()[2]['restarts'] == 1
+
+
+def test_truncated_symbols_close_connection_without_traceback(central):
+    encoder = QuoteEncoder(node_id=3)
+    body = BODY_HEADER.pack(1, SYMBOLS, 3, 2, 0.0) + SYMBOL_ID.pack(0, 10) + b'Bin'
+    frame = struct.pack('<I', len(body)) + body
+    central._serve_connection(io.BytesIO(encoder.hello('n3') + frame), ('127.0.0.1', 0))
+    assert central.venue_quotes() == {}